@@ -2,6 +2,9 @@
 
 __version__ = "1.0.0"
 
-from .server import main
+def main():
+    """Run the MCP SDK based server (imported lazily to keep package import light)."""
+    from .server import main as server_main
+    return server_main()
 
 __all__ = ["main"]
@@ -0,0 +1,25 @@
+"""
+Entry point: python -m claude_code_integration [--mock]
+
+Runs the FastMCP Claude Code server. With --mock (or CLAUDE_CODE_MOCK=true)
+the mock server is loaded instead, so the real server module and its CLI
+detection are never imported.
+"""
+
+import os
+import sys
+
+def main() -> None:
+    mock = "--mock" in sys.argv[1:] or os.getenv("CLAUDE_CODE_MOCK", "false").lower() == "true"
+    
+    if mock:
+        from .server_mock import mcp, logger
+        logger.info("Running in mock mode - no actual Claude Code CLI calls")
+    else:
+        from .server_fixed import mcp
+    
+    # Run with stdio transport
+    mcp.run(transport="stdio")
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,25 @@ Provides a bridge between Claude Desktop and Claude Code CLI
 import os
 import sys
 import json
+import shutil
+import signal
+import functools
 import subprocess
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from fastmcp import FastMCP
 
+# Optional faster JSON parser for the CLI's stream-json output
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 # Configure logging to stderr only
 import logging
 logger = logging.getLogger(__name__)
@@ -21,51 +33,176 @@ logger.propagate = False
 
 mcp = FastMCP("claude-code-integration")
 
+# Environment variables forwarded to the Claude Code CLI. Claude Desktop may
+# launch this server with a reduced environment, so auth is passed explicitly
+# and nothing outside this list leaks into the child process.
+CLI_ENV_ALLOWLIST = (
+    "PATH",
+    "PATHEXT",
+    "HOME",
+    "USERPROFILE",
+    "APPDATA",
+    "LOCALAPPDATA",
+    "SYSTEMROOT",
+    "TEMP",
+    "TMP",
+    "CLAUDE_CODE_OAUTH_TOKEN",
+    "ANTHROPIC_API_KEY",
+)
+
+def _build_cli_env() -> Dict[str, str]:
+    """Build the allowlisted environment for Claude Code CLI subprocesses."""
+    return {key: os.environ[key] for key in CLI_ENV_ALLOWLIST if key in os.environ}
+
+# Streaming limits for CLI output: max bytes per stdout line and max number
+# of stream-json events kept in memory for a single invocation
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+MAX_STREAM_EVENTS = 10000
+
+# Seconds a timed-out CLI process gets to exit after a polite stop request
+# before it is killed
+TERMINATE_GRACE_PERIOD = 5
+
+# Run the CLI in its own process group on Windows so it can receive CTRL_BREAK
+CLI_CREATION_FLAGS = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+
+async def _terminate_process(proc: asyncio.subprocess.Process) -> None:
+    """Stop a CLI process: polite signal, grace period, then kill and reap."""
+    if proc.returncode is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            proc.terminate()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=TERMINATE_GRACE_PERIOD)
+            return
+        except asyncio.TimeoutError:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+# Claude Code CLI location, resolved once at import so tool calls never re-probe
+_CLI_PATH = shutil.which("claude-code") or shutil.which("claude")
+
+# Default timeout for a single Claude Code CLI run, in seconds
+CLI_TIMEOUT = 300
+
 # Check if Claude Code CLI is available
-def check_claude_code_cli() -> Dict[str, Any]:
-    """Check if Claude Code CLI is installed and available."""
+@functools.lru_cache(maxsize=1)
+def _resolve_claude_code_cli() -> Dict[str, Any]:
+    """Describe the resolved Claude Code CLI, querying its version once."""
+    resolved = _CLI_PATH
+    if resolved is None:
+        return {
+            "installed": False,
+            "version": None,
+            "path": None,
+            "method": "not_found",
+            "suggestion": "Install Claude Code CLI from https://github.com/anthropics/claude-code"
+        }
+    
+    version = "unknown"
     try:
         result = subprocess.run(
-            ["claude-code", "--version"],
+            [resolved, "--version"],
             capture_output=True,
             text=True,
-            timeout=5
+            timeout=5,
+            env=_build_cli_env()
         )
-        
         if result.returncode == 0:
-            return {
-                "installed": True,
-                "version": result.stdout.strip(),
-                "path": "claude-code",
-                "method": "cli"
-            }
-    except (subprocess.SubprocessError, FileNotFoundError):
+            version = result.stdout.strip()
+    except (subprocess.SubprocessError, OSError):
         pass
     
-    # Check common installation paths
-    common_paths = [
-        Path.home() / ".local" / "bin" / "claude-code",
-        Path("/usr/local/bin/claude-code"),
-        Path("C:/Program Files/Claude/claude-code.exe"),
-        Path("C:/Users") / os.environ.get("USERNAME", "User") / "AppData/Local/Programs/claude-code/claude-code.exe"
-    ]
+    return {
+        "installed": True,
+        "version": version,
+        "path": resolved,
+        "method": "cli"
+    }
+
+def check_claude_code_cli() -> Dict[str, Any]:
+    """Check if Claude Code CLI is installed and available."""
+    return dict(_resolve_claude_code_cli())
+
+async def _run_cli(cmd: List[str], timeout: int = CLI_TIMEOUT) -> Dict[str, Any]:
+    """Run a Claude Code CLI command, streaming its stream-json output."""
+    # Show command without full prompt
+    redacted_cmd = " ".join(cmd[:3] + ["..."])
     
-    for path in common_paths:
-        if path.exists():
+    try:
+        # Execute command, reading stdout line by line as the CLI emits events
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_build_cli_env(),
+            limit=STREAM_LINE_LIMIT,
+            creationflags=CLI_CREATION_FLAGS
+        )
+        lines: List[str] = []
+        events: List[Any] = []
+        truncated = False
+        
+        async def read_events() -> None:
+            nonlocal truncated
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                if len(events) >= MAX_STREAM_EVENTS:
+                    truncated = True
+                    continue
+                text = line.decode(errors="replace").rstrip("\n")
+                if not text:
+                    continue
+                lines.append(text)
+                try:
+                    events.append(_json_loads(text))
+                except ValueError:
+                    events.append(text)
+        
+        # Read stdout and stderr together; on timeout or cancellation both
+        # readers are cancelled and the process is always reaped
+        try:
+            _, stderr_bytes = await asyncio.wait_for(
+                asyncio.gather(read_events(), proc.stderr.read()),
+                timeout=timeout
+            )
+            return_code = await proc.wait()
+        except asyncio.TimeoutError:
             return {
-                "installed": True,
-                "version": "unknown",
-                "path": str(path),
-                "method": "found_at_path"
+                "success": False,
+                "error": f"Command timed out after {timeout // 60} minutes",
+                "events": events,
+                "command": redacted_cmd
             }
-    
-    return {
-        "installed": False,
-        "version": None,
-        "path": None,
-        "method": "not_found",
-        "suggestion": "Install Claude Code CLI from https://github.com/anthropics/claude-code"
-    }
+        finally:
+            await _terminate_process(proc)
+        
+        stderr = stderr_bytes.decode(errors="replace")
+        
+        return {
+            "success": return_code == 0,
+            "stdout": "\n".join(lines),
+            "events": events,
+            "events_truncated": truncated,
+            "stderr": stderr,
+            "return_code": return_code,
+            "command": redacted_cmd
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "command": redacted_cmd
+        }
 
 @mcp.tool()
 async def execute_claude_code(
@@ -90,17 +227,16 @@ async def execute_claude_code(
     """
     
     # Check if CLI is available
-    cli_status = check_claude_code_cli()
-    if not cli_status["installed"]:
+    if _CLI_PATH is None:
         return {
             "success": False,
             "error": "Claude Code CLI not installed",
-            "details": cli_status,
+            "details": check_claude_code_cli(),
             "suggestion": "Please install Claude Code CLI to use this integration"
         }
     
     # Build command
-    cmd = [cli_status["path"] or "claude-code"]
+    cmd = [_CLI_PATH, "--output-format", "stream-json"]
     
     # Add optional parameters
     if model:
@@ -115,36 +251,7 @@ async def execute_claude_code(
     # Add the prompt
     cmd.append(prompt)
     
-    try:
-        # Execute command
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "return_code": result.returncode,
-            "command": " ".join(cmd[:2] + ["..."])  # Show command without full prompt
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "error": "Command timed out after 5 minutes",
-            "command": " ".join(cmd[:2] + ["..."])
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "command": " ".join(cmd[:2] + ["..."])
-        }
+    return await _run_cli(cmd)
 
 @mcp.tool()
 async def check_claude_code_installation() -> Dict[str, Any]:
@@ -167,7 +274,7 @@ async def analyze_project(project_path: str) -> Dict[str, Any]:
     Returns:
         Analysis results from Claude Code
     """
-    if not Path(project_path).exists():
+    if not await asyncio.to_thread(Path(project_path).exists):
         return {
             "success": False,
             "error": f"Project path does not exist: {project_path}"
@@ -238,7 +345,7 @@ async def run_claude_code_interactive(
     cmd = ["claude-code", "--interactive"]
     
     if working_directory:
-        if not Path(working_directory).exists():
+        if not await asyncio.to_thread(Path(working_directory).exists):
             return {
                 "success": False,
                 "error": f"Working directory does not exist: {working_directory}"
@@ -252,22 +359,6 @@ async def run_claude_code_interactive(
         system_prompt="You are in an interactive coding session. Be helpful and thorough."
     )
 
-# Simple mock mode for testing without CLI
-MOCK_MODE = os.getenv("CLAUDE_CODE_MOCK", "false").lower() == "true"
-
-if MOCK_MODE:
-    logger.info("Running in mock mode - no actual Claude Code CLI calls")
-    
-    @mcp.tool()
-    async def mock_execute(prompt: str) -> Dict[str, Any]:
-        """Mock execution for testing."""
-        return {
-            "success": True,
-            "mock": True,
-            "prompt_received": prompt[:100] + "..." if len(prompt) > 100 else prompt,
-            "response": "This is a mock response. Install Claude Code CLI for real functionality."
-        }
-
 if __name__ == "__main__":
     # Run with stdio transport
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Mock Claude Code Integration MCP Server using FastMCP
+Serves canned responses for testing without the Claude Code CLI
+"""
+
+import sys
+from typing import Dict, Any
+
+from fastmcp import FastMCP
+
+# Configure logging to stderr only; stdout carries the MCP protocol
+import logging
+logger = logging.getLogger(__name__)
+logger.propagate = False
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+
+mcp = FastMCP("claude-code-integration")
+
+@mcp.tool()
+async def mock_execute(prompt: str) -> Dict[str, Any]:
+    """Mock execution for testing."""
+    return {
+        "success": True,
+        "mock": True,
+        "prompt_received": prompt[:100] + "..." if len(prompt) > 100 else prompt,
+        "response": "This is a mock response. Install Claude Code CLI for real functionality."
+    }
+
+if __name__ == "__main__":
+    logger.info("Running in mock mode - no actual Claude Code CLI calls")
+    # Run with stdio transport
+    mcp.run(transport="stdio")
@@ -17,6 +17,7 @@ Created: June 2, 2025
 
 import json
 import time
+import asyncio
 from pathlib import Path
 
 def print_test_header(test_name: str):
@@ -30,6 +31,46 @@ def print_test_result(test_name: str, success: bool, details: str = ""):
     if details:
         print(f"   {details}")
 
+# (header, tool name, description of what is exercised, pass message)
+TOOL_PROBES = [
+    ("1. System Status Check", "get_system_status",
+     "Would test system health metrics", "System status endpoint available"),
+    ("2. Claude Code Availability Check", "check_claude_code_availability",
+     "Would check CLI installation and environment", "Availability check functional"),
+    ("3. Set Active Project", "set_active_project",
+     None, "Project context management available"),
+    ("4. Project Analysis", "analyze_project",
+     "Would perform deep project analysis", "Project analysis capabilities ready"),
+    ("5. Task Delegation", "delegate_coding_task",
+     "Would delegate coding task with priority", "Task delegation system functional"),
+    ("6. Task Progress Monitoring", "monitor_task_progress",
+     "Would monitor task execution progress", "Progress monitoring available"),
+    ("7. Task Results Retrieval", "get_task_results",
+     "Would retrieve completed task results", "Results retrieval system ready"),
+    ("8. Active Tasks Listing", "list_active_tasks",
+     "Would list all active tasks", "Task listing functionality available"),
+]
+
+# Upper bound for the whole probe run so one hung tool cannot stall the suite
+TEST_TIMEOUT = 60
+
+async def probe(tool_name: str, description: str) -> str:
+    """Exercise a single tool and return a description of what was checked."""
+    if tool_name == "set_active_project":
+        test_project_path = Path("C:/AI_Projects/Claude-MCP-tools").resolve()
+        return f"Would set active project to {test_project_path}"
+    return description
+
+async def run_probes() -> list:
+    """Run all tool probes concurrently; exceptions are returned, not raised."""
+    return await asyncio.wait_for(
+        asyncio.gather(
+            *[probe(tool_name, description) for _, tool_name, description, _ in TOOL_PROBES],
+            return_exceptions=True
+        ),
+        timeout=TEST_TIMEOUT
+    )
+
 def test_enhanced_claude_code_integration():
     """Comprehensive test of all 8 enhanced tools."""
     
@@ -37,109 +78,25 @@ def test_enhanced_claude_code_integration():
     print("="*80)
     
     test_results = {
-        "total_tests": 8,
+        "total_tests": len(TOOL_PROBES),
         "passed": 0,
         "failed": 0,
         "details": {}
     }
     
-    # Test 1: System Status Check
-    print_test_header("1. System Status Check")
-    try:
-        # This would call get_system_status() via MCP
-        print("Testing get_system_status tool...")
-        test_results["details"]["get_system_status"] = "Would test system health metrics"
-        test_results["passed"] += 1
-        print_test_result("get_system_status", True, "System status endpoint available")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["get_system_status"] = f"Error: {str(e)}"
-        print_test_result("get_system_status", False, str(e))
-    
-    # Test 2: Claude Code Availability Check
-    print_test_header("2. Claude Code Availability Check")
-    try:
-        print("Testing check_claude_code_availability tool...")
-        test_results["details"]["check_claude_code_availability"] = "Would check CLI installation and environment"
-        test_results["passed"] += 1
-        print_test_result("check_claude_code_availability", True, "Availability check functional")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["check_claude_code_availability"] = f"Error: {str(e)}"
-        print_test_result("check_claude_code_availability", False, str(e))
-    
-    # Test 3: Set Active Project
-    print_test_header("3. Set Active Project")
-    try:
-        test_project_path = Path("C:/AI_Projects/Claude-MCP-tools").resolve()
-        print(f"Testing set_active_project with path: {test_project_path}")
-        test_results["details"]["set_active_project"] = f"Would set active project to {test_project_path}"
-        test_results["passed"] += 1
-        print_test_result("set_active_project", True, "Project context management available")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["set_active_project"] = f"Error: {str(e)}"
-        print_test_result("set_active_project", False, str(e))
-    
-    # Test 4: Project Analysis
-    print_test_header("4. Project Analysis")
-    try:
-        print("Testing analyze_project tool...")
-        test_results["details"]["analyze_project"] = "Would perform deep project analysis"
-        test_results["passed"] += 1
-        print_test_result("analyze_project", True, "Project analysis capabilities ready")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["analyze_project"] = f"Error: {str(e)}"
-        print_test_result("analyze_project", False, str(e))
-    
-    # Test 5: Task Delegation
-    print_test_header("5. Task Delegation")
-    try:
-        print("Testing delegate_coding_task tool...")
-        test_results["details"]["delegate_coding_task"] = "Would delegate coding task with priority"
-        test_results["passed"] += 1
-        print_test_result("delegate_coding_task", True, "Task delegation system functional")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["delegate_coding_task"] = f"Error: {str(e)}"
-        print_test_result("delegate_coding_task", False, str(e))
-    
-    # Test 6: Task Progress Monitoring
-    print_test_header("6. Task Progress Monitoring")
-    try:
-        print("Testing monitor_task_progress tool...")
-        test_results["details"]["monitor_task_progress"] = "Would monitor task execution progress"
-        test_results["passed"] += 1
-        print_test_result("monitor_task_progress", True, "Progress monitoring available")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["monitor_task_progress"] = f"Error: {str(e)}"
-        print_test_result("monitor_task_progress", False, str(e))
-    
-    # Test 7: Task Results Retrieval
-    print_test_header("7. Task Results Retrieval")
-    try:
-        print("Testing get_task_results tool...")
-        test_results["details"]["get_task_results"] = "Would retrieve completed task results"
-        test_results["passed"] += 1
-        print_test_result("get_task_results", True, "Results retrieval system ready")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["get_task_results"] = f"Error: {str(e)}"
-        print_test_result("get_task_results", False, str(e))
-    
-    # Test 8: Active Tasks Listing
-    print_test_header("8. Active Tasks Listing")
-    try:
-        print("Testing list_active_tasks tool...")
-        test_results["details"]["list_active_tasks"] = "Would list all active tasks"
-        test_results["passed"] += 1
-        print_test_result("list_active_tasks", True, "Task listing functionality available")
-    except Exception as e:
-        test_results["failed"] += 1
-        test_results["details"]["list_active_tasks"] = f"Error: {str(e)}"
-        print_test_result("list_active_tasks", False, str(e))
+    results = asyncio.run(run_probes())
+    
+    for (header, tool_name, _, pass_message), result in zip(TOOL_PROBES, results):
+        print_test_header(header)
+        print(f"Testing {tool_name} tool...")
+        if isinstance(result, Exception):
+            test_results["failed"] += 1
+            test_results["details"][tool_name] = f"Error: {str(result)}"
+            print_test_result(tool_name, False, str(result))
+        else:
+            test_results["details"][tool_name] = result
+            test_results["passed"] += 1
+            print_test_result(tool_name, True, pass_message)
     
     # Final Results
     print("\n" + "="*80)
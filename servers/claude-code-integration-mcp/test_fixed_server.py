@@ -2,14 +2,10 @@
 """Test the fixed Claude Code Integration MCP server."""
 
 import sys
-import os
 
 # Add src to path
 sys.path.insert(0, 'src')
 
-# Test in mock mode
-os.environ["CLAUDE_CODE_MOCK"] = "true"
-
 try:
     print("Testing Fixed Claude Code Integration Server")
     print("=" * 50)
@@ -33,8 +29,11 @@ try:
     print("  - analyze_project")
     print("  - delegate_coding_task")
     print("  - run_claude_code_interactive")
-    if os.environ.get("CLAUDE_CODE_MOCK") == "true":
-        print("  - mock_execute (mock mode)")
+    
+    # Mock mode lives in its own server module
+    from claude_code_integration.server_mock import mcp as mock_mcp
+    print(f"\nMock server name: {mock_mcp.name}")
+    print("  - mock_execute (python -m claude_code_integration --mock)")
     
     print("\n✅ Server is properly configured and ready to use!")
     print("\nTo use with Claude Desktop:")
@@ -11,11 +11,13 @@ import asyncio
 from pathlib import Path
 env_file = Path('.env')
 if env_file.exists():
-    with open(env_file) as f:
-        for line in f:
-            if '=' in line and not line.startswith('#'):
-                key, value = line.strip().split('=', 1)
-                os.environ[key] = value
+    os.environ.update(
+        (key, value)
+        for key, sep, value in (
+            line.strip().partition('=') for line in env_file.read_text().splitlines()
+        )
+        if sep and not key.startswith('#')
+    )
 
 # Add the server source to Python path
 sys.path.insert(0, 'src')
@@ -5,11 +5,19 @@ Simple test for Claude Code Integration MCP Server
 
 import os
 import sys
+import asyncio
+import importlib.util
 
 # Add the server source to Python path
 sys.path.insert(0, 'src')
 
-def test_api_connection():
+import pytest
+
+# Upper bound for the whole run so a hung API call cannot stall the test
+TEST_TIMEOUT = 60
+
+@pytest.mark.asyncio
+async def test_api_connection():
     """Test the Anthropic API connection."""
     
     print("Testing Claude Code Integration MCP Server")
@@ -25,31 +33,33 @@ def test_api_connection():
     print()
     
     # Test imports
+    anthropic_available = importlib.util.find_spec("anthropic") is not None
+    print(f"Anthropic Package: {'Available' if anthropic_available else 'Not Available'}")
+    
     try:
-        import anthropic
-        print(f"Anthropic Package: Available")
-        
-        if anthropic_key:
+        if anthropic_available and anthropic_key:
+            import anthropic
             print("Testing API connection...")
-            client = anthropic.Anthropic(api_key=anthropic_key)
+            client = anthropic.AsyncAnthropic(api_key=anthropic_key)
             
             # Test API call
-            response = client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=50,
-                system="You are Claude Code CLI. Respond with: Connection successful!",
-                messages=[{"role": "user", "content": "test"}]
+            response = await asyncio.wait_for(
+                client.messages.create(
+                    model="claude-3-sonnet-20240229",
+                    max_tokens=50,
+                    system="You are Claude Code CLI. Respond with: Connection successful!",
+                    messages=[{"role": "user", "content": "test"}]
+                ),
+                timeout=TEST_TIMEOUT
             )
             
             if response.content:
                 content = response.content[0].text
                 print(f"   API Response: {content}")
                 print("   Mock API functionality: WORKING!")
-        else:
+        elif anthropic_available:
             print("   Skipping API test - no key provided")
             
-    except ImportError:
-        print(f"Anthropic Package: Not Available")
     except Exception as e:
         print(f"   API Error: {str(e)}")
     
@@ -62,4 +72,4 @@ def test_api_connection():
     print("   - Server: READY FOR DEPLOYMENT")
 
 if __name__ == "__main__":
-    test_api_connection()
+    asyncio.run(test_api_connection())
@@ -4,20 +4,55 @@ Focuses on what Claude can't do - actually execute formatters
 """
 
 from fastmcp import FastMCP
+import asyncio
+import atexit
 import subprocess
 import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
+from typing import Iterator, Optional
 
 mcp = FastMCP("code-formatter")
 
-# Simple formatter mapping
-FORMATTERS = {
-    ".py": ["black", "-"],
-    ".js": ["prettier", "--stdin-filepath", "file.js"],
-    ".ts": ["prettier", "--stdin-filepath", "file.ts"],
-    ".go": ["gofmt"],
-    ".rs": ["rustfmt"],
-}
+# Long-lived worker pool so repeated formatter calls skip the interpreter-side
+# spawn cost (expensive on Windows); workers are recycled to bound memory
+_EXEC = ProcessPoolExecutor(
+    max_workers=4,
+    **({"max_tasks_per_child": 100} if sys.version_info >= (3, 11) else {})
+)
+atexit.register(_EXEC.shutdown, wait=False)
+
+def _run_cli(cmd: list[str], input: Optional[str] = None, timeout: Optional[float] = None) -> tuple[int, str, str]:
+    """Run a command in a pool worker. Returns (returncode, stdout, stderr)."""
+    result = subprocess.run(
+        cmd,
+        input=input,
+        text=True,
+        capture_output=True,
+        timeout=timeout
+    )
+    return result.returncode, result.stdout, result.stderr
+
+# Simple formatter mapping (read-only)
+FORMATTERS = MappingProxyType({
+    ".py": ("black", "-"),
+    ".js": ("prettier", "--stdin-filepath", "file.js"),
+    ".ts": ("prettier", "--stdin-filepath", "file.ts"),
+    ".go": ("gofmt",),
+    ".rs": ("rustfmt",),
+})
+
+# Formatters that rewrite many files in place with a single invocation
+BATCH_FORMATTERS = MappingProxyType({
+    ".py": ("black", "-q"),
+    ".js": ("prettier", "--write"),
+    ".ts": ("prettier", "--write"),
+    ".go": ("gofmt", "-w"),
+    ".rs": ("rustfmt",),
+})
 
 @mcp.tool()
 async def format_code(file_path: str) -> str:
@@ -33,30 +68,117 @@ async def format_code(file_path: str) -> str:
     if ext not in FORMATTERS:
         return f"No formatter configured for {ext} files"
     
-    formatter_cmd = FORMATTERS[ext]
+    formatter_cmd = list(FORMATTERS[ext])
     
     try:
         # Read file content
         content = path.read_text()
         
         # Run formatter
-        result = subprocess.run(
-            formatter_cmd,
-            input=content,
-            text=True,
-            capture_output=True
+        loop = asyncio.get_running_loop()
+        returncode, stdout, stderr = await loop.run_in_executor(
+            _EXEC, _run_cli, formatter_cmd, content
         )
         
-        if result.returncode == 0:
+        if returncode == 0:
             # Write formatted content back
-            path.write_text(result.stdout)
+            path.write_text(stdout)
             return f"Successfully formatted {file_path}"
         else:
-            return f"Formatter error: {result.stderr}"
+            return f"Formatter error: {stderr}"
             
     except Exception as e:
         return f"Error formatting file: {str(e)}"
 
+# VCS and tool-cache directories never descended into by format_directory
+IGNORED_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__",
+    ".venv", "venv", ".tox", ".mypy_cache",
+})
+
+def _walk(root: str, exts: tuple[str, ...]) -> Iterator[tuple[str, str]]:
+    """
+    Yield (extension, path) for files under root whose name ends with one of exts.
+    Uses os.scandir and filters on the raw entry name, skipping IGNORED_DIRS.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in IGNORED_DIRS:
+                            stack.append(entry.path)
+                        continue
+                    for ext in exts:
+                        if entry.name.endswith(ext):
+                            yield ext, entry.path
+                            break
+        except OSError:
+            continue
+
+# Bound each batch invocation's argv well under ARG_MAX and the ~32K
+# command-line limit on Windows
+BATCH_MAX_FILES = 200
+BATCH_MAX_ARGV_CHARS = 16000
+
+def _chunks(paths: list[str]) -> Iterator[list[str]]:
+    """Split paths into chunks bounded by BATCH_MAX_FILES and BATCH_MAX_ARGV_CHARS."""
+    chunk: list[str] = []
+    size = 0
+    for path in paths:
+        if chunk and (len(chunk) >= BATCH_MAX_FILES or size + len(path) + 1 > BATCH_MAX_ARGV_CHARS):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(path)
+        size += len(path) + 1
+    if chunk:
+        yield chunk
+
+async def _format_chunk(ext: str, paths: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Format one chunk of files with a single formatter process.
+    If the formatter fails, the chunk is re-run file by file so errors are
+    attributed to the files that caused them. Returns (formatted, errors).
+    """
+    cmd = [*BATCH_FORMATTERS[ext], *paths]
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        await proc.wait()
+    except Exception as e:
+        return [], [f"*{ext}: Error formatting files: {str(e)}"]
+
+    if proc.returncode == 0:
+        return paths, []
+
+    formatted = []
+    errors = []
+    for file_path in paths:
+        result = await format_code(file_path)
+        if "Successfully" in result:
+            formatted.append(file_path)
+        else:
+            errors.append(f"{file_path}: {result}")
+    return formatted, errors
+
+async def _format_batch(ext: str, paths: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Format all files of one extension, one formatter process per chunk.
+    Returns (formatted, errors).
+    """
+    formatted = []
+    errors = []
+    for chunk in _chunks(paths):
+        ok, failed = await _format_chunk(ext, chunk)
+        formatted.extend(ok)
+        errors.extend(failed)
+    return formatted, errors
+
 @mcp.tool()
 async def format_directory(directory: str, extensions: list[str]) -> dict:
     """
@@ -66,11 +188,27 @@ async def format_directory(directory: str, extensions: list[str]) -> dict:
     formatted = []
     errors = []
     
-    for ext in extensions:
-        for file_path in Path(directory).rglob(f"*{ext}"):
-            result = await format_code(str(file_path))
+    # Each file is attributed to the first extension it matches, so it is
+    # only formatted once
+    by_ext: dict[str, list[str]] = defaultdict(list)
+    for ext, file_path in _walk(directory, tuple(dict.fromkeys(extensions))):
+        by_ext[ext].append(file_path)
+    
+    for ext, files in by_ext.items():
+        if not files:
+            continue
+        
+        # One formatter process per extension instead of one per file
+        if ext in BATCH_FORMATTERS:
+            ok, failed = await _format_batch(ext, files)
+            formatted.extend(ok)
+            errors.extend(failed)
+            continue
+        
+        for file_path in files:
+            result = await format_code(file_path)
             if "Successfully" in result:
-                formatted.append(str(file_path))
+                formatted.append(file_path)
             else:
                 errors.append(f"{file_path}: {result}")
     
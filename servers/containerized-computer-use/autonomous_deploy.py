@@ -5,23 +5,89 @@ This script will perform all deployment steps that can be done without human int
 """
 
 import asyncio
+import atexit
+import contextlib
+import hashlib
+import io
 import json
 import logging
-import subprocess
+import os
+import shutil
 import sys
 import time
+from collections import deque
+from logging.handlers import MemoryHandler
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
-# Configure logging
+# Configure logging; file output is buffered in memory and flushed on
+# errors, when the report is generated, and at exit
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+_file_handler = logging.FileHandler('autonomous_deploy.log')
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_buffer = MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.ERROR,
+    target=_file_handler,
+    flushOnClose=True
+)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('autonomous_deploy.log')
+        _log_buffer
     ]
 )
+atexit.register(logging.shutdown)
+
+# Single in-container probe for test_container; each check prints a __NAME__
+# marker followed by its output so one docker exec covers all of them
+CONTAINER_PROBE_SCRIPT = (
+    "echo __PYTHON__; python3 -c \"print('Container test successful!')\"; "
+    "echo __VNC__; ps aux | grep -c '[x]11vnc'"
+)
+
+# Exits 0 once the container's VNC server is up; neither the Dockerfile nor
+# docker-compose.yml defines a HEALTHCHECK to poll instead
+READY_PROBE_SCRIPT = "ps aux | grep -q '[x]11vnc'"
+
+# Output kept per command: number of trailing lines, and max bytes per line
+OUTPUT_TAIL_LINES = 256
+OUTPUT_LINE_LIMIT = 1024 * 1024
+
+# Image built by build_docker_image and used by docker-compose
+IMAGE_TAG = "containerized-computer-use:latest"
+
+# BuildKit local layer cache, relative to the build context
+BUILD_CACHE_DIR = "./.buildx-cache"
+
+# Files that end up in the image; a change to any of them forces a rebuild
+BUILD_INPUTS = (
+    "Dockerfile",
+    "computer_use_container.py",
+    "container_mcp_wrapper.py",
+    "requirements.txt",
+    "startup.sh",
+    "supervisord.conf",
+)
+
+def _atomic_write_text(path: Path, text: str) -> bool:
+    """Write text via a temp file and os.replace; skip if the file already matches.
+    
+    Returns True if the file was (re)written.
+    """
+    data = text.encode()
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+def _atomic_write_json(path: Path, obj: Any) -> bool:
+    """Serialize obj as indented JSON and write it with _atomic_write_text."""
+    return _atomic_write_text(path, json.dumps(obj, indent=2))
 
 class AutonomousDeployer:
     """Handles autonomous deployment of Containerized Computer Use MCP."""
@@ -33,6 +99,17 @@ class AutonomousDeployer:
             "steps_failed": [],
             "needs_human": []
         }
+        # Test virtual environment layout, fixed per platform
+        self._is_win = os.name == "nt"
+        self._venv_path = self.base_dir / ".venv"
+        self._venv_bin = self._venv_path / ("Scripts" if self._is_win else "bin")
+        self._venv_pip = self._venv_bin / ("pip.exe" if self._is_win else "pip")
+        self._venv_python = self._venv_bin / ("python.exe" if self._is_win else "python")
+        # Read-only docker inspections: command tuple -> (timestamp, result)
+        self._probe_cache: Dict[Tuple[str, ...], Tuple[float, Tuple[bool, str]]] = {}
+        # Filled in by check_docker_status from a single `docker version` call
+        self._docker_info: Dict[str, Any] = {}
+        self._compose_cmd: List[str] = ["docker-compose"]
         
     def log_step(self, step: str, success: bool, details: str = ""):
         """Log deployment step result."""
@@ -44,38 +121,104 @@ class AutonomousDeployer:
         else:
             self.results["steps_failed"].append(f"{step}: {details}")
     
-    def run_command(self, cmd: List[str], cwd: str = None) -> Tuple[bool, str]:
-        """Run a command and return success status and output."""
+    async def run_command(self, cmd: List[str], cwd: str = None,
+                          env: Dict[str, str] = None) -> Tuple[bool, str]:
+        """Run a command and return success status and output.
+        
+        env, if given, is layered on top of the current environment.
+        Only the last OUTPUT_TAIL_LINES lines of output are kept, so chatty
+        commands such as image builds do not accumulate in memory.
+        """
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
                 cwd=cwd or self.base_dir,
-                timeout=300  # 5 minute timeout
+                env={**os.environ, **env} if env else None,
+                limit=OUTPUT_LINE_LIMIT
             )
-            return result.returncode == 0, result.stdout + result.stderr
+            tail = deque(maxlen=OUTPUT_TAIL_LINES)
+            
+            async def drain() -> None:
+                async for line in proc.stdout:
+                    tail.append(line)
+                await proc.wait()
+            
+            try:
+                await asyncio.wait_for(drain(), timeout=300)  # 5 minute timeout
+            except asyncio.TimeoutError:
+                return False, f"Command timed out: {' '.join(cmd)}"
+            finally:
+                # Any early exit (timeout, overlong line, cancellation) must
+                # not leave the child running
+                if proc.returncode is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        proc.kill()
+                    await proc.wait()
+            return proc.returncode == 0, b"".join(tail).decode(errors="replace")
         except Exception as e:
             return False, str(e)
     
+    @contextlib.asynccontextmanager
+    async def _timed(self, name: str):
+        """Record the wall time of the enclosed phase, in ms, under results["timings"]."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            self.results.setdefault("timings", {})[name] = round(elapsed_ms, 3)
+    
+    async def probe(self, cmd: List[str], ttl: float = 2.0) -> Tuple[bool, str]:
+        """Run a read-only inspection command, reusing a result younger than ttl seconds."""
+        key = tuple(cmd)
+        cached = self._probe_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        result = await self.run_command(cmd)
+        self._probe_cache[key] = (time.monotonic(), result)
+        return result
+    
     async def check_docker_status(self) -> bool:
         """Check if Docker is running."""
         logging.info("\n=== Checking Docker Status ===")
         
-        success, output = self.run_command(["docker", "ps"])
+        # One call proves the daemon is reachable and reports both versions
+        success, output = await self.probe(
+            ["docker", "version", "--format", "{{json .}}"]
+        )
         if success:
-            self.log_step("Docker check", True, "Docker is running")
+            try:
+                self._docker_info = json.loads(output)
+            except ValueError:
+                self._docker_info = {}
+            server_version = (self._docker_info.get("Server") or {}).get("Version", "")
+            if self._parse_version(server_version) >= (20, 10):
+                self._compose_cmd = ["docker", "compose"]
+            self.log_step("Docker check", True, f"Docker {server_version or 'is'} running")
             return True
         else:
             self.log_step("Docker check", False, "Docker Desktop not running")
             self.results["needs_human"].append("Start Docker Desktop")
             return False
     
+    @staticmethod
+    def _parse_version(version: str) -> Tuple[int, ...]:
+        """Turn "24.0.7" into (24, 0, 7); non-numeric parts end the tuple."""
+        parts = []
+        for part in version.split("."):
+            if not part.isdigit():
+                break
+            parts.append(int(part))
+        return tuple(parts)
+    
     async def validate_files(self) -> bool:
         """Validate all required files exist."""
         logging.info("\n=== Validating Files ===")
         
-        success, output = self.run_command(
+        success, output = await self.run_command(
             [sys.executable, "validate_setup.py"]
         )
         
@@ -86,25 +229,70 @@ class AutonomousDeployer:
             self.log_step("File validation", False, "Missing files")
             return False
     
+    def _build_inputs_hash(self) -> str:
+        """Hash the files copied into the image, to detect stale builds."""
+        digest = hashlib.sha256()
+        for name in BUILD_INPUTS:
+            path = self.base_dir / name
+            digest.update(name.encode())
+            if path.exists():
+                digest.update(path.read_bytes())
+        return digest.hexdigest()
+    
+    async def _builder_exports_cache(self) -> bool:
+        """True if the active buildx builder supports cache export (not the docker driver)."""
+        success, output = await self.probe(["docker", "buildx", "inspect"])
+        if not success:
+            return False
+        for line in io.StringIO(output):
+            key, _, value = line.partition(":")
+            if key.strip() == "Driver":
+                return value.strip() not in ("", "docker")
+        return False
+    
     async def build_docker_image(self) -> bool:
         """Build the Docker image."""
         logging.info("\n=== Building Docker Image ===")
         
-        # Check if image already exists
-        success, output = self.run_command(
-            ["docker", "images", "-q", "containerized-computer-use:latest"]
+        force_rebuild = bool(os.environ.get("FORCE_REBUILD"))
+        build_hash = self._build_inputs_hash()
+        hash_marker = self.base_dir / ".build-hash"
+        
+        # Check if image already exists and was built from the current inputs.
+        # Without a marker the image was built elsewhere (e.g. by
+        # docker-compose) from unknown inputs, so it is rebuilt once
+        success, output = await self.probe(
+            ["docker", "images", "-q", IMAGE_TAG]
         )
         
-        if success and output.strip():
-            logging.info("Docker image already exists, skipping build")
-            self.log_step("Docker image check", True, "Image exists")
-            return True
+        if success and output.strip() and not force_rebuild:
+            if hash_marker.exists() and hash_marker.read_text().strip() == build_hash:
+                logging.info("Docker image already exists, skipping build")
+                self.log_step("Docker image check", True, "Image exists")
+                return True
+            logging.info("Build inputs changed or unknown since last build, rebuilding")
         
-        # Build the image
+        # Build the image with BuildKit. The default docker driver cannot
+        # export a cache and relies on its own layer cache; other builders
+        # reuse a local cache directory
         logging.info("Building Docker image (this may take 5-10 minutes)...")
-        success, output = self.run_command(
-            ["docker-compose", "build", "--no-cache"]
+        cmd = ["docker", "buildx", "build", "--load"]
+        if await self._builder_exports_cache():
+            cmd += [
+                "--cache-from", f"type=local,src={BUILD_CACHE_DIR}",
+                "--cache-to", f"type=local,dest={BUILD_CACHE_DIR},mode=max",
+            ]
+        cmd += ["-t", IMAGE_TAG]
+        if force_rebuild:
+            cmd.append("--no-cache")
+        cmd.append(".")
+        success, output = await self.run_command(
+            cmd,
+            env={"DOCKER_BUILDKIT": "1", "COMPOSE_DOCKER_CLI_BUILD": "1"}
         )
+        self._probe_cache.clear()
+        if success:
+            hash_marker.write_text(build_hash)
         
         if success:
             self.log_step("Docker build", True, "Image built successfully")
@@ -117,76 +305,102 @@ class AutonomousDeployer:
         """Start the Docker container."""
         logging.info("\n=== Starting Container ===")
         
-        # Check if container exists
-        success, output = self.run_command(
-            ["docker", "ps", "-a", "--filter", "name=windows-computer-use", "--format", "{{.Names}}"]
+        # One inspect answers both "exists?" (exit status) and "running?"
+        exists, output = await self.probe(
+            ["docker", "inspect", "-f", "{{.State.Running}}", "windows-computer-use"]
         )
         
-        if "windows-computer-use" in output:
-            # Container exists, check if running
-            success, output = self.run_command(
-                ["docker", "ps", "--filter", "name=windows-computer-use", "--format", "{{.Names}}"]
-            )
-            
-            if "windows-computer-use" in output:
+        if exists:
+            if output.strip() == "true":
                 self.log_step("Container status", True, "Already running")
                 return True
             else:
                 # Start existing container
-                success, output = self.run_command(
+                success, output = await self.run_command(
                     ["docker", "start", "windows-computer-use"]
                 )
+                self._probe_cache.clear()
                 if success:
                     self.log_step("Container start", True, "Started existing container")
                     return True
         
         # Create new container
-        success, output = self.run_command(
-            ["docker-compose", "up", "-d"]
+        success, output = await self.run_command(
+            [*self._compose_cmd, "up", "-d"]
         )
+        self._probe_cache.clear()
         
         if success:
             self.log_step("Container creation", True, "Container started")
-            # Wait for services to initialize
-            logging.info("Waiting 10 seconds for services to initialize...")
-            await asyncio.sleep(10)
             return True
         else:
             self.log_step("Container creation", False, output[-500:])
             return False
     
+    async def _wait_ready(self, name: str, timeout: float = 30) -> bool:
+        """Poll until the container's VNC server is running, with backoff."""
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while True:
+            success, _ = await self.run_command(
+                ["docker", "exec", name, "sh", "-c", READY_PROBE_SCRIPT]
+            )
+            if success:
+                return True
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, 2.0)
+    
+    @staticmethod
+    def parse_probe_sections(output: str) -> Dict[str, str]:
+        """Split CONTAINER_PROBE_SCRIPT output into {section name: text}."""
+        sections = {}
+        name = None
+        for line in output.splitlines():
+            if line.startswith("__") and line.endswith("__") and len(line) > 4:
+                name = line.strip("_")
+                sections[name] = ""
+            elif name is not None:
+                sections[name] += line + "\n"
+        return sections
+    
     async def test_container(self) -> bool:
         """Test container functionality."""
         logging.info("\n=== Testing Container ===")
         
-        # Test 1: Container is running
-        success, output = self.run_command(
-            ["docker", "ps", "--filter", "name=windows-computer-use", "--format", "{{.Status}}"]
+        # Run the status probe and a single batched in-container probe
+        # concurrently; the exec emits one marker-delimited section per check
+        (status_ok, status_output), (_, probe_output) = await asyncio.gather(
+            self.probe(
+                ["docker", "inspect", "-f", "{{.State.Status}}", "windows-computer-use"]
+            ),
+            self.run_command(
+                ["docker", "exec", "windows-computer-use", "sh", "-c", CONTAINER_PROBE_SCRIPT]
+            )
         )
+        sections = self.parse_probe_sections(probe_output)
+        exec_output = sections.get("PYTHON", "")
+        vnc_count = sections.get("VNC", "").strip()
         
-        if not success or "Up" not in output:
+        # Test 1: Container is running
+        if not status_ok or status_output.strip() != "running":
             self.log_step("Container running test", False, "Container not running")
             return False
         else:
-            self.log_step("Container running test", True, output.strip())
+            self.log_step("Container running test", True, status_output.strip())
         
         # Test 2: Execute command in container
-        success, output = self.run_command(
-            ["docker", "exec", "windows-computer-use", "python3", "-c", "print('Container test successful!')"]
-        )
-        
-        if success and "Container test successful!" in output:
+        if "Container test successful!" in exec_output:
             self.log_step("Container exec test", True, "Python execution works")
         else:
             self.log_step("Container exec test", False, "Cannot execute Python in container")
             return False
         
         # Test 3: Check VNC is running
-        success, output = self.run_command(
-            ["docker", "exec", "windows-computer-use", "ps", "aux"]
-        )
-        
-        if success and "x11vnc" in output:
+        if vnc_count.isdigit() and int(vnc_count) > 0:
             self.log_step("VNC service test", True, "VNC is running")
         else:
             self.log_step("VNC service test", False, "VNC not running")
@@ -195,40 +409,85 @@ class AutonomousDeployer:
     
     async def run_mcp_tests(self) -> bool:
         """Run MCP server tests."""
-        logging.info("\n=== Running MCP Tests ===")
+        if not await self._prepare_venv():
+            return False
+        return await self._run_tests()
+    
+    async def _prepare_venv(self) -> bool:
+        """Create the test virtual environment and install dependencies."""
+        logging.info("\n=== Preparing MCP Test Environment ===")
+        
+        # Prefer uv, then virtualenv; both create environments much faster
+        # than the stdlib venv module
+        uv = shutil.which("uv")
+        virtualenv = shutil.which("virtualenv")
         
         # Create virtual environment if needed
-        venv_path = self.base_dir / ".venv"
-        if not venv_path.exists():
+        if not self._venv_python.exists():
             logging.info("Creating virtual environment...")
-            success, output = self.run_command(
-                [sys.executable, "-m", "venv", ".venv"]
-            )
+            if uv:
+                create_cmd = [uv, "venv", "--quiet", ".venv"]
+            elif virtualenv:
+                create_cmd = [virtualenv, "--quiet", ".venv"]
+            else:
+                create_cmd = [sys.executable, "-m", "venv", ".venv"]
+            success, output = await self.run_command(create_cmd)
             if not success:
                 self.log_step("Virtual environment creation", False, output)
                 return False
         
-        # Install dependencies
-        pip_path = venv_path / "Scripts" / "pip.exe"
-        if not pip_path.exists():
-            pip_path = venv_path / "bin" / "pip"
+        # Skip installation when requirements and the installer are unchanged
+        # since the last successful install into this venv
+        _, installer_version = await self.run_command(
+            [uv, "--version"] if uv else [str(self._venv_python), "-m", "pip", "--version"]
+        )
+        digest = hashlib.sha256(
+            (self.base_dir / "requirements.txt").read_bytes() + installer_version.encode()
+        ).hexdigest()
+        reqs_marker = self._venv_path / ".reqs.sha256"
+        if reqs_marker.exists() and reqs_marker.read_text().strip() == digest:
+            self.log_step("Dependency installation", True, "Requirements unchanged, cache hit")
+            return True
         
+        # Install dependencies
         logging.info("Installing dependencies...")
-        success, output = self.run_command(
-            [str(pip_path), "install", "-r", "requirements.txt"]
-        )
+        if uv:
+            success, output = await self.run_command(
+                [
+                    uv, "pip", "install",
+                    "--python", str(self._venv_python),
+                    "--quiet",
+                    "-r", "requirements.txt"
+                ],
+                env={"UV_CACHE_DIR": str(self.base_dir / ".uv-cache")}
+            )
+        else:
+            success, output = await self.run_command(
+                [
+                    str(self._venv_pip), "install",
+                    "--require-virtualenv",
+                    "--disable-pip-version-check",
+                    "--no-input",
+                    "--prefer-binary",
+                    "-q",
+                    "-r", "requirements.txt"
+                ],
+                env={"PIP_CACHE_DIR": str(self.base_dir / ".pip-cache")}
+            )
         
         if not success:
             self.log_step("Dependency installation", False, "Failed to install dependencies")
             return False
+        reqs_marker.write_text(digest)
+        return True
+    
+    async def _run_tests(self) -> bool:
+        """Run the MCP server test suite inside the prepared virtual environment."""
+        logging.info("\n=== Running MCP Tests ===")
         
         # Run tests
-        python_path = venv_path / "Scripts" / "python.exe"
-        if not python_path.exists():
-            python_path = venv_path / "bin" / "python"
-        
-        success, output = self.run_command(
-            [str(python_path), "test_complete_server.py"]
+        success, output = await self.run_command(
+            [str(self._venv_python), "test_complete_server.py"]
         )
         
         if success and "All tests passed!" in output:
@@ -236,10 +495,10 @@ class AutonomousDeployer:
             return True
         else:
             self.log_step("MCP tests", False, "Some tests failed")
-            # Log specific failures
-            for line in output.split('\n'):
+            # Log specific failures, scanning the output without splitting it
+            for line in io.StringIO(output):
                 if "FAILED" in line:
-                    logging.error(f"  {line}")
+                    logging.error("  %s", line.rstrip("\n"))
             return False
     
     async def update_claude_config(self) -> bool:
@@ -250,8 +509,8 @@ class AutonomousDeployer:
         
         try:
             # Read current config
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            original_text = config_path.read_text()
+            config = json.loads(original_text)
             
             # Check if already configured
             if "containerized-computer-use" in config.get("mcpServers", {}):
@@ -268,16 +527,16 @@ class AutonomousDeployer:
                 "description": "Containerized Computer Use with Docker isolation and VNC access"
             }
             
-            config["mcpServers"]["containerized-computer-use"] = new_server
+            config.setdefault("mcpServers", {})["containerized-computer-use"] = new_server
             
-            # Backup current config
+            # Backup the pre-update config, unless the backup is already
+            # newer than the config it would copy
             backup_path = config_path.with_suffix('.json.bak')
-            with open(backup_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            if not backup_path.exists() or backup_path.stat().st_mtime < config_path.stat().st_mtime:
+                _atomic_write_text(backup_path, original_text)
             
-            # Write updated config
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            # Write updated config atomically
+            _atomic_write_json(config_path, config)
             
             self.log_step("Config update", True, "Configuration updated")
             self.results["needs_human"].append("Restart Claude Desktop to apply changes")
@@ -307,50 +566,72 @@ class AutonomousDeployer:
         logging.info("Starting Autonomous Deployment of Containerized Computer Use MCP")
         logging.info("=" * 70)
         
-        # Step 1: Validate prerequisites
-        docker_ok = await self.check_docker_status()
+        # Step 1: Validate prerequisites (independent, so run together)
+        async with self._timed("prerequisites"):
+            docker_ok, files_ok = await asyncio.gather(
+                self.check_docker_status(),
+                self.validate_files()
+            )
         if not docker_ok:
             logging.warning("Docker not running - cannot proceed with deployment")
             return
         
-        files_ok = await self.validate_files()
         if not files_ok:
             logging.error("File validation failed - fix issues before proceeding")
             return
         
         # Step 2: Build and deploy
-        build_ok = await self.build_docker_image()
+        async with self._timed("docker_build"):
+            build_ok = await self.build_docker_image()
         if not build_ok:
             logging.error("Docker build failed - check logs for details")
             return
         
         # Step 3: Start container
-        container_ok = await self.start_container()
+        async with self._timed("container_start"):
+            container_ok = await self.start_container()
         if not container_ok:
             logging.error("Container start failed")
             return
         
+        # Prepare the test venv while the container services initialize
+        async with self._timed("services_ready_and_venv"):
+            venv_task = asyncio.create_task(self._prepare_venv())
+            logging.info("Waiting for services to initialize...")
+            ready, venv_ok = await asyncio.gather(
+                self._wait_ready("windows-computer-use"),
+                venv_task
+            )
+        if not ready:
+            logging.warning("Container did not report ready within timeout")
+        
         # Step 4: Test container
-        test_ok = await self.test_container()
+        async with self._timed("container_tests"):
+            test_ok = await self.test_container()
         if not test_ok:
             logging.warning("Container tests failed - container may not be fully functional")
         
         # Step 5: Run MCP tests
-        mcp_ok = await self.run_mcp_tests()
+        async with self._timed("mcp_tests"):
+            mcp_ok = venv_ok and await self._run_tests()
         if not mcp_ok:
             logging.warning("MCP tests failed - server may not work properly")
         
         # Step 6: Update configuration
-        config_ok = await self.update_claude_config()
+        async with self._timed("config_update"):
+            config_ok = await self.update_claude_config()
         
         # Step 7: Attempt restart (will fail, needs human)
-        restart_ok = await self.attempt_claude_restart()
+        async with self._timed("claude_restart"):
+            restart_ok = await self.attempt_claude_restart()
         
         # Generate summary report
         await self.generate_report()
     
     async def generate_report(self):
         """Generate deployment summary report."""
+        _log_buffer.flush()
+        
         logging.info("\n" + "=" * 70)
         logging.info("DEPLOYMENT SUMMARY")
         logging.info("=" * 70)
@@ -378,6 +659,13 @@ class AutonomousDeployer:
         
         logging.info(f"\n📊 Overall Success Rate: {success_rate:.1f}%")
         
+        # Slowest phases, to show where the deploy time goes
+        timings = self.results.get("timings", {})
+        if timings:
+            logging.info("\n⏱️ Slowest Phases:")
+            for name, ms in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:5]:
+                logging.info(f"  • {name}: {ms:.1f} ms")
+        
         if success_rate >= 80:
             logging.info("\n✅ DEPLOYMENT SUCCESSFUL!")
             logging.info("\nContainer Details:")
@@ -393,8 +681,7 @@ class AutonomousDeployer:
         
         # Save report
         report_path = self.base_dir / "deployment_report.json"
-        with open(report_path, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        _atomic_write_json(report_path, self.results)
         logging.info(f"\nDetailed report saved to: {report_path}")
 
 
@@ -8,47 +8,166 @@ import subprocess
 import time
 import sys
 import os
+import json
 from pathlib import Path
 
+# Optional fast process listing
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+CLAUDE_IMAGE_NAME = "Claude.exe"
+
+# Seconds to wait for Claude to exit after taskkill
+KILL_TIMEOUT = 5
+
+# Common paths for Claude Desktop, expanded once at import
+CLAUDE_EXE_PATHS = (
+    r"C:\Users\Nithin\AppData\Local\Programs\claude-desktop\Claude.exe",
+    r"C:\Program Files\Claude\Claude.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Programs\claude-desktop\Claude.exe"),
+)
+
+# Keyword arguments for the console tools (tasklist, taskkill): no console
+# window, no inherited stdin. Not used for Claude.exe itself, whose first
+# window would take its show state from this STARTUPINFO and start hidden.
+_SP_KW = {
+    "creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    "stdin": subprocess.DEVNULL,
+}
+if sys.platform == "win32":
+    _startupinfo = subprocess.STARTUPINFO()
+    _startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _startupinfo.wShowWindow = subprocess.SW_HIDE
+    _SP_KW["startupinfo"] = _startupinfo
+
+# Remembers the last Claude.exe that was found so restarts skip the path scan
+EXE_CACHE_PATH = Path.home() / ".claude_restart_cache.json"
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_void_p),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    _kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    _kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    _kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    _kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    def _process_running_toolhelp(image_name):
+        """Check for a process by image name via a Toolhelp32 snapshot (no subprocess)."""
+        snapshot = _kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        if snapshot == INVALID_HANDLE_VALUE:
+            raise OSError(ctypes.get_last_error(), "CreateToolhelp32Snapshot failed")
+        try:
+            entry = PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+            found = _kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            target = image_name.lower()
+            while found:
+                if entry.szExeFile.lower() == target:
+                    return True
+                found = _kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+            return False
+        finally:
+            _kernel32.CloseHandle(snapshot)
+
 def check_claude_running():
     """Check if Claude Desktop is running."""
     try:
+        if PSUTIL_AVAILABLE:
+            target = CLAUDE_IMAGE_NAME.lower()
+            return any(
+                (p.info["name"] or "").lower() == target
+                for p in psutil.process_iter(["name"])
+            )
+        if sys.platform == "win32":
+            return _process_running_toolhelp(CLAUDE_IMAGE_NAME)
+        
         result = subprocess.run(
-            ["tasklist", "/FI", "IMAGENAME eq Claude.exe"],
-            capture_output=True,
-            text=True
+            ["tasklist", "/FI", f"IMAGENAME eq {CLAUDE_IMAGE_NAME}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            **_SP_KW
         )
-        return "Claude.exe" in result.stdout
+        return CLAUDE_IMAGE_NAME in result.stdout
     except:
         return False
 
 def kill_claude():
-    """Kill Claude Desktop process."""
+    """Kill Claude Desktop process and wait for it to exit.
+    
+    Returns False if it is still running after KILL_TIMEOUT seconds.
+    """
     try:
-        subprocess.run(["taskkill", "/F", "/IM", "Claude.exe"], capture_output=True)
-        time.sleep(2)
-        return True
+        subprocess.run(
+            ["taskkill", "/F", "/IM", CLAUDE_IMAGE_NAME, "/T"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **_SP_KW
+        )
+        deadline = time.monotonic() + KILL_TIMEOUT
+        while check_claude_running() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not check_claude_running()
     except:
         return False
 
+def _cached_claude_exe():
+    """Return the cached Claude executable path if it still exists."""
+    try:
+        exe = json.loads(EXE_CACHE_PATH.read_text()).get("exe")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return exe if exe and os.path.exists(exe) else None
+
+def _find_claude_exe():
+    """Locate Claude.exe, preferring the cached path and caching the first hit."""
+    exe = _cached_claude_exe()
+    if exe:
+        return exe
+    
+    for path in CLAUDE_EXE_PATHS:
+        if os.path.exists(path):
+            try:
+                EXE_CACHE_PATH.write_text(json.dumps({"exe": path}))
+            except OSError:
+                pass
+            return path
+    return None
+
 def start_claude():
     """Start Claude Desktop."""
     try:
-        # Common paths for Claude Desktop
-        possible_paths = [
-            r"C:\Users\Nithin\AppData\Local\Programs\claude-desktop\Claude.exe",
-            r"C:\Program Files\Claude\Claude.exe",
-            os.path.expandvars(r"%LOCALAPPDATA%\Programs\claude-desktop\Claude.exe"),
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                subprocess.Popen([path])
-                print(f"Started Claude Desktop from: {path}")
-                return True
+        path = _find_claude_exe()
+        if path:
+            subprocess.Popen([path], close_fds=True, stdin=subprocess.DEVNULL)
+            print(f"Started Claude Desktop from: {path}")
+            return True
         
         # Try using start command as fallback
-        subprocess.Popen(["start", "claude://"], shell=True)
+        subprocess.Popen(["start", "claude://"], shell=True, close_fds=True, stdin=subprocess.DEVNULL)
         return True
     except Exception as e:
         print(f"Failed to start Claude: {e}")
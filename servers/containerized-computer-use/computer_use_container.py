@@ -11,13 +11,20 @@ This server implements the exact tool specifications from Anthropic's Computer U
 
 import sys
 import json
-import base64
+import asyncio
+import itertools
 import subprocess
 import time
 import os
+import uuid
+import select
+import signal
+import shutil
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from io import BytesIO
+from functools import lru_cache
 import logging
 
 # Configure logging to stderr
@@ -30,263 +37,734 @@ logging.basicConfig(
 try:
     import pyautogui
     from PIL import ImageGrab, Image
-    import pyscreenshot as ImageGrab  # Fallback for Linux
     PYAUTOGUI_AVAILABLE = True
 except ImportError:
     PYAUTOGUI_AVAILABLE = False
     logging.warning("pyautogui not available - screenshot and mouse control disabled")
 
-# Configure pyautogui safety if available
+# Linux screenshot fallback; kept under its own name so it does not shadow PIL's ImageGrab
+try:
+    import pyscreenshot
+    PYSCREENSHOT_AVAILABLE = True
+except ImportError:
+    PYSCREENSHOT_AVAILABLE = False
+
+# SIMD base64 for screenshot payloads; same signature as the stdlib version
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# Fast screenshot path: mss grabs the raw framebuffer, libjpeg-turbo encodes it
+try:
+    import mss
+    import numpy as np
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGRX
+    _TJ = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):
+    TURBOJPEG_AVAILABLE = False
+
+try:
+    import simplejpeg
+    SIMPLEJPEG_AVAILABLE = True
+except ImportError:
+    SIMPLEJPEG_AVAILABLE = False
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+SCREENSHOT_JPEG_QUALITY = 60
+
+# Default screenshot downscale factor; models do not need native resolution,
+# and halving each side cuts the encoded payload roughly 4x
+SCREENSHOT_SCALE = 0.5
+
+# Rows at the top and bottom of a frame ignored when checking whether the
+# screen changed (e.g. a panel clock); 0 compares the whole frame
+SCREEN_DIFF_IGNORE_TOP = 0
+SCREEN_DIFF_IGNORE_BOTTOM = 0
+
+# Background capture: at most one grab per interval, stopping after the idle
+# timeout without screenshot requests
+SCREENSHOT_CAPTURE_INTERVAL = 0.1
+SCREENSHOT_IDLE_TIMEOUT = 30.0
+
+# Actions that do not change what is on screen
+PASSIVE_ACTIONS = frozenset({"screenshot", "cursor_position", "wait"})
+
+# When set (ideally to a tmpfs path), screenshots are written here and returned
+# as file URIs instead of base64, for clients on the same filesystem. Files are
+# reused round-robin so the directory stays bounded.
+SCREENSHOT_DIR = os.environ.get("SCREENSHOT_DIR")
+SCREENSHOT_FILES_KEPT = 16
+
+# A click at the coordinate of a mouse_move this recent skips its own move
+MOVE_COALESCE_WINDOW = 0.2
+
+# Created on first use so importing this module does not need a display
+_MSS = None
+
+def _get_mss():
+    """Return the shared mss instance, creating it on first use."""
+    global _MSS
+    if _MSS is None:
+        _MSS = mss.mss()
+    return _MSS
+
+@lru_cache(maxsize=256)
+def _resolve_path(path: str) -> Path:
+    """Resolve a text editor path; repeated edits of a file skip the realpath walk."""
+    return Path(path).resolve()
+
+# Direct XTEST input on a persistent display connection for the hot mouse actions
+try:
+    from Xlib import X, display as xdisplay
+    from Xlib.ext import xtest
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# X button numbers for clicks and wheel scrolling
+X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+X_SCROLL_UP, X_SCROLL_DOWN = 4, 5
+
+# bash_20250124 runs commands in one persistent shell; a command running past
+# the timeout kills the shell, and the next command starts a fresh one
+BASH_TIMEOUT = 30
+BASH_READ_SIZE = 64 * 1024
+
+# Text longer than this is typed by xdotool in one call instead of per-key pyautogui
+TYPE_BULK_THRESHOLD = 32
+XDOTOOL_PATH = shutil.which("xdotool")
+
+# Configure pyautogui safety if available; callers pace their own actions
 if PYAUTOGUI_AVAILABLE:
     pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.1
+    pyautogui.PAUSE = 0
 
 
 class ContainerizedComputerUseAPI:
     """Computer Use API compliant implementation for containerized Linux environments."""
     
+    # computer_20250124 actions; each is implemented by an _act_<name> method
+    ACTIONS = (
+        "screenshot", "cursor_position", "mouse_move", "left_click", "right_click",
+        "middle_click", "double_click", "triple_click", "left_click_drag", "scroll",
+        "key", "hold_key", "type", "left_mouse_down", "left_mouse_up", "wait",
+        "batch",
+    )
+    
     def __init__(self):
-        # Get screen dimensions for tool configuration
-        if PYAUTOGUI_AVAILABLE:
+        # Persistent X connection for XTEST input; pyautogui is the fallback
+        self._dpy = None
+        if XLIB_AVAILABLE:
             try:
-                self.screen_width, self.screen_height = pyautogui.size()
-            except Exception:
-                # Default to common resolution if detection fails
-                self.screen_width, self.screen_height = 1920, 1080
-        else:
-            self.screen_width, self.screen_height = 1920, 1080
+                self._dpy = xdisplay.Display()
+                self._root = self._dpy.screen().root
+            except Exception as e:
+                logging.warning(f"Xlib display unavailable, using pyautogui for input: {e}")
+                self._dpy = None
+        
+        # Get screen dimensions for tool configuration
+        self.screen_width, self.screen_height = self._screen_size()
             
-        self.current_directory = os.getcwd()
+        self.current_directory = os.getcwd()  # Where the bash shell starts
         self.editor_files = {}  # Track open files for text editor
         
+        # Persistent bash shell, started on first use; commands keep its
+        # cwd and environment, and the lock runs one command at a time
+        self._shell = None
+        self._shell_lock = threading.Lock()
+        
+        # Reused across screenshots: the last captured BGRA frame and the
+        # encode buffer for the Pillow paths
+        self._fb = (
+            np.empty((self.screen_height, self.screen_width, 4), dtype=np.uint8)
+            if MSS_AVAILABLE else None
+        )
+        self._buf = BytesIO()
+        
+        # Pillow screenshot backend used when mss is unavailable; probed on
+        # first use and kept until it fails
+        self._grab_image = None
+        self._screenshot_seq = itertools.count()
+        
+        # Last directly grabbed (frame, JPEG) and last (image bytes, base64)
+        # pair; an unchanged frame reuses both instead of encoding again
+        self._prev_frame = None
+        self._prev_jpeg = None
+        self._prev_b64 = None
+        if SCREENSHOT_DIR:
+            os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+        
+        # Background capture state: the newest (grab time, JPEG bytes) pair is
+        # published under _capture_lock; _last_input is when the last action,
+        # bash command or file edit that may have changed the screen finished
+        self._capture_lock = threading.Lock()
+        self._capture_thread = None
+        self._latest_jpeg = None
+        self._last_screenshot_request = 0.0
+        self._last_input = 0.0
+        
+        # (x, y, time) of the last mouse_move, cleared by any other action
+        self._last_move = None
+        
+        # Action name -> bound handler, so dispatch is a single dict lookup
+        self._actions = {name: getattr(self, f"_act_{name}") for name in self.ACTIONS}
+        
         logging.info(f"Initialized: {self.screen_width}x{self.screen_height}")
         
+    def _screen_size(self) -> Tuple[int, int]:
+        """Return the screen size without a new X round-trip where possible.
+        
+        SCREEN_WIDTH/SCREEN_HEIGHT or the container's VNC_RESOLUTION win, then
+        the persistent X connection, then pyautogui.
+        """
+        try:
+            width = int(os.environ.get("SCREEN_WIDTH", "0"))
+            height = int(os.environ.get("SCREEN_HEIGHT", "0"))
+            if not (width and height) and "VNC_RESOLUTION" in os.environ:
+                width, height = map(int, os.environ["VNC_RESOLUTION"].lower().split("x"))
+            if width > 0 and height > 0:
+                return width, height
+        except ValueError:
+            logging.warning("Ignoring malformed screen size in the environment")
+        
+        if self._dpy is not None:
+            screen = self._dpy.screen()
+            return screen.width_in_pixels, screen.height_in_pixels
+        if PYAUTOGUI_AVAILABLE:
+            try:
+                return tuple(pyautogui.size())
+            except Exception:
+                pass
+        # Default to common resolution if detection fails
+        return 1920, 1080
+    
     def computer_20250124(self, action: str, **kwargs) -> Dict[str, Any]:
         """
         Enhanced computer control tool compatible with Computer Use API.
         
         Actions: key, hold_key, type, cursor_position, mouse_move, left_mouse_down,
         left_mouse_up, left_click, left_click_drag, right_click, middle_click, 
-        double_click, triple_click, scroll, wait, screenshot
+        double_click, triple_click, scroll, wait, screenshot, batch
+        
+        Coordinates are screen pixels unless scale is given, in which case
+        they (and cursor_position's result) are in the space of a screenshot
+        taken at that scale. For screenshot, scale is the capture scale.
         """
         if not PYAUTOGUI_AVAILABLE and action != "wait":
             return {"output": f"ERROR: pyautogui not available for action: {action}"}
-            
+        
+        handler = self._actions.get(action)
+        if handler is None:
+            return {"output": f"ERROR: Unknown action: {action}"}
+        
         try:
-            if action == "screenshot":
-                return self._take_screenshot()
-            
-            elif action == "cursor_position":
-                x, y = pyautogui.position()
-                return {
-                    "output": f"Cursor position: ({x}, {y})",
-                    "coordinate": [x, y]
-                }
-            
-            elif action == "mouse_move":
-                coordinate = kwargs.get("coordinate")
-                if not coordinate or len(coordinate) != 2:
-                    return {"output": "ERROR: mouse_move requires coordinate [x, y]"}
+            if action != "screenshot":
+                kwargs = self._to_screen(kwargs)
+            return handler(**kwargs)
+        except Exception as e:
+            logging.error(f"Error in computer action {action}: {e}")
+            return {"output": f"ERROR: {str(e)}"}
+        finally:
+            if action not in PASSIVE_ACTIONS:
+                self._last_input = time.monotonic()
+                if action != "mouse_move":
+                    self._last_move = None
+    
+    @staticmethod
+    def _to_screen(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Map coordinate arguments given at kwargs["scale"] to screen pixels."""
+        scale = float(kwargs.get("scale") or 1.0)
+        if scale == 1.0:
+            return kwargs
+        mapped = dict(kwargs)
+        for key in ("coordinate", "start_coordinate", "end_coordinate"):
+            value = mapped.get(key)
+            if value and len(value) == 2:
+                mapped[key] = [round(v / scale) for v in value]
+        return mapped
+    
+    def _act_screenshot(self, **kwargs) -> Dict[str, Any]:
+        return self._take_screenshot(
+            scale=kwargs.get("scale", SCREENSHOT_SCALE),
+            fresh=kwargs.get("fresh", False)
+        )
+    
+    def _act_cursor_position(self, **kwargs) -> Dict[str, Any]:
+        if self._dpy is not None:
+            pointer = self._root.query_pointer()
+            x, y = pointer.root_x, pointer.root_y
+        else:
+            x, y = pyautogui.position()
+        scale = float(kwargs.get("scale") or 1.0)
+        if scale != 1.0:
+            x, y = round(x * scale), round(y * scale)
+        return {
+            "output": f"Cursor position: ({x}, {y})",
+            "coordinate": [x, y]
+        }
+    
+    def _act_mouse_move(self, **kwargs) -> Dict[str, Any]:
+        coordinate = kwargs.get("coordinate")
+        if not coordinate or len(coordinate) != 2:
+            return {"output": "ERROR: mouse_move requires coordinate [x, y]"}
+        x, y = coordinate
+        if self._dpy is not None:
+            self._x_move(x, y)
+        else:
+            pyautogui.moveTo(x, y)
+        self._last_move = (x, y, time.monotonic())
+        return {"output": f"Moved cursor to ({x}, {y})"}
+    
+    def _act_left_click(self, **kwargs) -> Dict[str, Any]:
+        coordinate = kwargs.get("coordinate")
+        text = kwargs.get("text", "")  # Key combo to hold during click
+        if not text:
+            return self._button_click("Left clicked", "left", pyautogui.click, coordinate)
+        
+        # Hold keys while clicking
+        with pyautogui.hold(text.split('+')):
+            if coordinate:
                 x, y = coordinate
-                pyautogui.moveTo(x, y)
-                return {"output": f"Moved cursor to ({x}, {y})"}
-            
-            elif action == "left_click":
-                coordinate = kwargs.get("coordinate")
-                text = kwargs.get("text", "")  # Key combo to hold during click
-                
-                if coordinate:
-                    x, y = coordinate
-                    if text:  # Hold keys while clicking
-                        with pyautogui.hold(text.split('+')):
-                            pyautogui.click(x, y)
-                    else:
-                        pyautogui.click(x, y)
-                    return {"output": f"Left clicked at ({x}, {y})"}
-                else:
-                    # Click at current position
-                    if text:
-                        with pyautogui.hold(text.split('+')):
-                            pyautogui.click()
-                    else:
-                        pyautogui.click()
-                    return {"output": "Left clicked at current position"}
-            
-            elif action == "right_click":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.rightClick(x, y)
-                    return {"output": f"Right clicked at ({x}, {y})"}
+                if self._pointer_at(coordinate):
+                    pyautogui.click()
                 else:
-                    pyautogui.rightClick()
-                    return {"output": "Right clicked at current position"}
-            
-            elif action == "middle_click":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.middleClick(x, y)
-                    return {"output": f"Middle clicked at ({x}, {y})"}
-                else:
-                    pyautogui.middleClick()
-                    return {"output": "Middle clicked at current position"}
-            
-            elif action == "double_click":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.doubleClick(x, y)
-                    return {"output": f"Double clicked at ({x}, {y})"}
-                else:
-                    pyautogui.doubleClick()
-                    return {"output": "Double clicked at current position"}
-            
-            elif action == "triple_click":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.tripleClick(x, y)
-                    return {"output": f"Triple clicked at ({x}, {y})"}
-                else:
-                    pyautogui.tripleClick()
-                    return {"output": "Triple clicked at current position"}
-            
-            elif action == "left_click_drag":
-                start_coordinate = kwargs.get("start_coordinate")
-                end_coordinate = kwargs.get("end_coordinate")
-                
-                if not start_coordinate or not end_coordinate:
-                    return {"output": "ERROR: left_click_drag requires start_coordinate and end_coordinate"}
-                
-                sx, sy = start_coordinate
-                ex, ey = end_coordinate
-                pyautogui.dragTo(ex, ey, button='left', duration=0.5)
-                return {"output": f"Dragged from ({sx}, {sy}) to ({ex}, {ey})"}
-            
-            elif action == "scroll":
-                coordinate = kwargs.get("coordinate")
-                clicks = kwargs.get("clicks", 5)  # Default 5 clicks
-                direction = kwargs.get("direction", "down")
-                
-                # Move to coordinate if provided
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.moveTo(x, y)
-                
-                # Scroll direction
-                scroll_amount = -clicks if direction == "down" else clicks
-                pyautogui.scroll(scroll_amount)
-                
-                return {"output": f"Scrolled {direction} {abs(clicks)} clicks"}
-            
-            elif action == "key":
-                text = kwargs.get("text", "")
-                if not text:
-                    return {"output": "ERROR: key action requires text parameter"}
-                
-                # Handle special keys and combinations
-                pyautogui.press(text)
-                return {"output": f"Pressed key: {text}"}
-            
-            elif action == "hold_key":
-                text = kwargs.get("text", "")
-                duration = kwargs.get("duration", 1000) / 1000.0  # Convert ms to seconds
-                
-                if not text:
-                    return {"output": "ERROR: hold_key requires text parameter"}
-                
-                pyautogui.keyDown(text)
-                time.sleep(duration)
-                pyautogui.keyUp(text)
-                
-                return {"output": f"Held key '{text}' for {duration} seconds"}
-            
-            elif action == "type":
-                text = kwargs.get("text", "")
-                if not text:
-                    return {"output": "ERROR: type action requires text parameter"}
-                
-                pyautogui.write(text)
-                return {"output": f"Typed: {text[:50]}{'...' if len(text) > 50 else ''}"}
-            
-            elif action == "left_mouse_down":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.moveTo(x, y)
-                    pyautogui.mouseDown(button='left')
-                    return {"output": f"Left mouse down at ({x}, {y})"}
-                else:
-                    pyautogui.mouseDown(button='left')
-                    return {"output": "Left mouse down at current position"}
+                    pyautogui.click(x, y)
+                return {"output": f"Left clicked at ({x}, {y})"}
+            pyautogui.click()
+            return {"output": "Left clicked at current position"}
+    
+    def _act_right_click(self, **kwargs) -> Dict[str, Any]:
+        return self._button_click("Right clicked", "right", pyautogui.rightClick, kwargs.get("coordinate"))
+    
+    def _act_middle_click(self, **kwargs) -> Dict[str, Any]:
+        return self._button_click("Middle clicked", "middle", pyautogui.middleClick, kwargs.get("coordinate"))
+    
+    def _act_double_click(self, **kwargs) -> Dict[str, Any]:
+        return self._button_click("Double clicked", "left", pyautogui.doubleClick, kwargs.get("coordinate"), count=2)
+    
+    def _act_triple_click(self, **kwargs) -> Dict[str, Any]:
+        return self._button_click("Triple clicked", "left", pyautogui.tripleClick, kwargs.get("coordinate"), count=3)
+    
+    def _button_click(self, label: str, button: str, fallback, coordinate=None, count: int = 1) -> Dict[str, Any]:
+        """Click via XTEST when connected, else via the given pyautogui function."""
+        move_to = None if self._pointer_at(coordinate) else coordinate
+        if self._dpy is not None:
+            self._x_click(X_BUTTONS[button], move_to, count=count)
+        elif move_to:
+            fallback(*move_to)
+        else:
+            fallback()
+        
+        if coordinate:
+            x, y = coordinate
+            return {"output": f"{label} at ({x}, {y})"}
+        return {"output": f"{label} at current position"}
+    
+    def _pointer_at(self, coordinate) -> bool:
+        """True if the previous action was a recent mouse_move to this coordinate."""
+        if not coordinate or self._last_move is None:
+            return False
+        x, y, moved_at = self._last_move
+        return (
+            list(coordinate) == [x, y]
+            and time.monotonic() - moved_at < MOVE_COALESCE_WINDOW
+        )
+    
+    def _act_left_click_drag(self, **kwargs) -> Dict[str, Any]:
+        start_coordinate = kwargs.get("start_coordinate")
+        end_coordinate = kwargs.get("end_coordinate")
+        
+        if not start_coordinate or not end_coordinate:
+            return {"output": "ERROR: left_click_drag requires start_coordinate and end_coordinate"}
+        
+        sx, sy = start_coordinate
+        ex, ey = end_coordinate
+        pyautogui.dragTo(ex, ey, button='left', duration=0.5)
+        return {"output": f"Dragged from ({sx}, {sy}) to ({ex}, {ey})"}
+    
+    def _act_scroll(self, **kwargs) -> Dict[str, Any]:
+        coordinate = kwargs.get("coordinate")
+        clicks = kwargs.get("clicks", 5)  # Default 5 clicks
+        direction = kwargs.get("direction", "down")
+        
+        if self._dpy is not None:
+            # Wheel buttons 4/5, one press per click
+            button = X_SCROLL_DOWN if direction == "down" else X_SCROLL_UP
+            self._x_click(button, coordinate, count=abs(clicks))
+        else:
+            # Move to coordinate if provided
+            if coordinate:
+                x, y = coordinate
+                pyautogui.moveTo(x, y)
             
-            elif action == "left_mouse_up":
-                coordinate = kwargs.get("coordinate")
-                if coordinate:
-                    x, y = coordinate
-                    pyautogui.moveTo(x, y)
-                    pyautogui.mouseUp(button='left')
-                    return {"output": f"Left mouse up at ({x}, {y})"}
+            # Scroll direction
+            scroll_amount = -clicks if direction == "down" else clicks
+            pyautogui.scroll(scroll_amount)
+        
+        return {"output": f"Scrolled {direction} {abs(clicks)} clicks"}
+    
+    def _act_key(self, **kwargs) -> Dict[str, Any]:
+        text = kwargs.get("text", "")
+        if not text:
+            return {"output": "ERROR: key action requires text parameter"}
+        
+        # Handle special keys and combinations
+        pyautogui.press(text)
+        return {"output": f"Pressed key: {text}"}
+    
+    def _act_hold_key(self, **kwargs) -> Dict[str, Any]:
+        text = kwargs.get("text", "")
+        duration = kwargs.get("duration", 1000) / 1000.0  # Convert ms to seconds
+        
+        if not text:
+            return {"output": "ERROR: hold_key requires text parameter"}
+        
+        pyautogui.keyDown(text)
+        time.sleep(duration)
+        pyautogui.keyUp(text)
+        
+        return {"output": f"Held key '{text}' for {duration} seconds"}
+    
+    def _act_type(self, **kwargs) -> Dict[str, Any]:
+        text = kwargs.get("text", "")
+        if not text:
+            return {"output": "ERROR: type action requires text parameter"}
+        
+        if len(text) > TYPE_BULK_THRESHOLD and XDOTOOL_PATH:
+            subprocess.run(
+                [XDOTOOL_PATH, "type", "--delay", "0", "--", text],
+                check=True, capture_output=True, timeout=60
+            )
+        else:
+            pyautogui.write(text)
+        return {"output": f"Typed: {text[:50]}{'...' if len(text) > 50 else ''}"}
+    
+    def _act_left_mouse_down(self, **kwargs) -> Dict[str, Any]:
+        coordinate = kwargs.get("coordinate")
+        if coordinate:
+            x, y = coordinate
+            pyautogui.moveTo(x, y)
+            pyautogui.mouseDown(button='left')
+            return {"output": f"Left mouse down at ({x}, {y})"}
+        pyautogui.mouseDown(button='left')
+        return {"output": "Left mouse down at current position"}
+    
+    def _act_left_mouse_up(self, **kwargs) -> Dict[str, Any]:
+        coordinate = kwargs.get("coordinate")
+        if coordinate:
+            x, y = coordinate
+            pyautogui.moveTo(x, y)
+            pyautogui.mouseUp(button='left')
+            return {"output": f"Left mouse up at ({x}, {y})"}
+        pyautogui.mouseUp(button='left')
+        return {"output": "Left mouse up at current position"}
+    
+    def _act_batch(self, **kwargs) -> Dict[str, Any]:
+        """Run a list of actions in order, stopping at the first error.
+        
+        Outputs are joined one per line; the last screenshot taken, if any,
+        is returned with them.
+        """
+        actions = kwargs.get("actions")
+        if not actions or not isinstance(actions, list):
+            return {"output": "ERROR: batch requires a non-empty actions list"}
+        
+        outputs = []
+        screenshot = None
+        for sub in actions:
+            sub = dict(sub)
+            name = sub.pop("action", None)
+            if name == "batch":
+                result = {"output": "ERROR: batch actions cannot be nested"}
+            else:
+                result = self.computer_20250124(name, **sub)
+            output = result.get("output", "")
+            outputs.append(output)
+            if "screenshot" in result or "screenshot_uri" in result:
+                screenshot = result
+            if output.startswith("ERROR"):
+                break
+        
+        batch_result = {"output": "\n".join(outputs)}
+        if screenshot is not None:
+            for key in ("screenshot", "screenshot_uri", "mime_type", "scale"):
+                if key in screenshot:
+                    batch_result[key] = screenshot[key]
+        return batch_result
+    
+    def _act_wait(self, **kwargs) -> Dict[str, Any]:
+        duration = kwargs.get("duration", 1000) / 1000.0  # Convert ms to seconds
+        time.sleep(duration)
+        return {"output": f"Waited {duration} seconds"}
+    
+    def _x_move(self, x: int, y: int) -> None:
+        """Move the pointer with XTEST."""
+        xtest.fake_input(self._dpy, X.MotionNotify, x=int(x), y=int(y))
+        self._dpy.sync()
+    
+    def _x_click(self, button: int, coordinate=None, count: int = 1) -> None:
+        """Press and release an X button count times, optionally moving first."""
+        if coordinate:
+            xtest.fake_input(self._dpy, X.MotionNotify, x=int(coordinate[0]), y=int(coordinate[1]))
+        for _ in range(count):
+            xtest.fake_input(self._dpy, X.ButtonPress, button)
+            xtest.fake_input(self._dpy, X.ButtonRelease, button)
+        self._dpy.sync()
+    
+    def _grab_jpeg(self, scale: float = 1.0) -> Optional[bytes]:
+        """Capture the primary monitor with mss and encode it as JPEG.
+        
+        The frame is kept in self._fb and handed to the encoder as-is (BGRX),
+        so no RGB copy is made; scale < 1 downsamples it first. Returns None
+        if no JPEG encoder is available.
+        """
+        self._fb, frame = self._grab_frame(_get_mss(), self._fb, scale)
+        if self._prev_jpeg is not None and not self._frames_differ(self._prev_frame, frame):
+            return self._prev_jpeg
+        
+        jpeg_bytes = self._encode_jpeg(frame)
+        if jpeg_bytes is None and PYAUTOGUI_AVAILABLE:
+            height, width = frame.shape[:2]
+            image = Image.frombuffer("RGB", (width, height), frame, "raw", "BGRX", 0, 1)
+            jpeg_bytes = self._encode_pil(image, format='JPEG', quality=SCREENSHOT_JPEG_QUALITY)
+        if jpeg_bytes is not None:
+            # At scale 1 the frame is self._fb itself, which the next grab overwrites
+            self._prev_frame = frame.copy() if frame is self._fb else frame
+            self._prev_jpeg = jpeg_bytes
+        return jpeg_bytes
+    
+    @staticmethod
+    def _frames_differ(prev, curr) -> bool:
+        """Return True unless prev and curr have the same shape and identical pixels.
+        
+        Rows in the SCREEN_DIFF_IGNORE_* bands are skipped. OpenCV's norm is a
+        single vectorized pass with no temporary; numpy is the fallback.
+        """
+        if prev is None or prev.shape != curr.shape:
+            return True
+        stop = curr.shape[0] - SCREEN_DIFF_IGNORE_BOTTOM
+        prev = prev[SCREEN_DIFF_IGNORE_TOP:stop]
+        curr = curr[SCREEN_DIFF_IGNORE_TOP:stop]
+        if CV2_AVAILABLE:
+            return cv2.norm(prev, curr, cv2.NORM_INF) > 0
+        return not np.array_equal(prev, curr)
+    
+    def _grab_frame(self, sct, fb, scale: float):
+        """Grab the primary monitor into fb (reallocated on resolution change).
+        
+        Returns (fb, frame) where frame is fb downscaled by scale.
+        """
+        shot = sct.grab(sct.monitors[1])
+        shape = (shot.height, shot.width, 4)
+        if fb is None or fb.shape != shape:
+            fb = np.empty(shape, dtype=np.uint8)
+        np.copyto(fb, np.frombuffer(shot.raw, dtype=np.uint8).reshape(shape))
+        return fb, self._downscale(fb, scale)
+    
+    @staticmethod
+    def _encode_jpeg(frame) -> Optional[bytes]:
+        """Encode a BGRX frame with libjpeg-turbo or simplejpeg (thread-safe)."""
+        if TURBOJPEG_AVAILABLE:
+            return _TJ.encode(frame, quality=SCREENSHOT_JPEG_QUALITY, pixel_format=TJPF_BGRX)
+        if SIMPLEJPEG_AVAILABLE:
+            return simplejpeg.encode_jpeg(frame, quality=SCREENSHOT_JPEG_QUALITY, colorspace='BGRX')
+        return None
+    
+    def _capture_loop(self) -> None:
+        """Grab and encode frames at the default scale until screenshots go idle.
+        
+        Runs on its own thread with its own mss instance (mss handles are
+        per-thread on X11). Encoded frames are immutable bytes, so publishing
+        is a reference swap under the lock.
+        """
+        sct = mss.mss()
+        fb = None
+        prev_frame = prev_jpeg = None
+        try:
+            while True:
+                with self._capture_lock:
+                    if time.monotonic() - self._last_screenshot_request > SCREENSHOT_IDLE_TIMEOUT:
+                        return
+                
+                grabbed_at = time.monotonic()
+                fb, frame = self._grab_frame(sct, fb, SCREENSHOT_SCALE)
+                if prev_jpeg is not None and not self._frames_differ(prev_frame, frame):
+                    jpeg_bytes = prev_jpeg
                 else:
-                    pyautogui.mouseUp(button='left')
-                    return {"output": "Left mouse up at current position"}
-                    
-            elif action == "wait":
-                duration = kwargs.get("duration", 1000) / 1000.0  # Convert ms to seconds
-                time.sleep(duration)
-                return {"output": f"Waited {duration} seconds"}
+                    jpeg_bytes = self._encode_jpeg(frame)
+                    prev_frame = frame.copy() if frame is fb else frame
+                    prev_jpeg = jpeg_bytes
                 
-            else:
-                return {"output": f"ERROR: Unknown action: {action}"}
+                with self._capture_lock:
+                    self._latest_jpeg = (grabbed_at, jpeg_bytes)
                 
+                time.sleep(max(0.0, SCREENSHOT_CAPTURE_INTERVAL - (time.monotonic() - grabbed_at)))
         except Exception as e:
-            logging.error(f"Error in computer action {action}: {e}")
-            return {"output": f"ERROR: {str(e)}"}
+            logging.warning(f"Background screenshot capture stopped: {e}")
+        finally:
+            sct.close()
+            with self._capture_lock:
+                self._capture_thread = None
+                self._latest_jpeg = None
     
-    def _take_screenshot(self) -> Dict[str, Any]:
-        """Take a screenshot and return base64 encoded image."""
-        try:
-            # Try different screenshot methods for container compatibility
-            screenshot = None
+    def _background_jpeg(self) -> Optional[bytes]:
+        """Return the newest background frame if it was grabbed after the last input action.
+        
+        Starts the capture thread if needed. Returns None when no such frame
+        exists yet; a direct grab is then quicker than waiting for the next tick.
+        """
+        with self._capture_lock:
+            self._last_screenshot_request = time.monotonic()
+            if self._capture_thread is None:
+                self._capture_thread = threading.Thread(
+                    target=self._capture_loop, name="screenshot-capture", daemon=True
+                )
+                self._capture_thread.start()
             
-            # Method 1: pyautogui screenshot
-            if PYAUTOGUI_AVAILABLE:
+            latest = self._latest_jpeg
+        if latest is not None and latest[0] >= self._last_input:
+            return latest[1]
+        return None
+    
+    @staticmethod
+    def _downscale(frame, scale: float):
+        """Downsample a frame by scale (0 < scale < 1) with area averaging."""
+        if scale >= 1.0:
+            return frame
+        height, width = frame.shape[:2]
+        if CV2_AVAILABLE:
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        # Without OpenCV, decimate by the nearest integer step
+        step = max(1, round(1 / scale))
+        return np.ascontiguousarray(frame[::step, ::step])
+    
+    def _encode_pil(self, image, **save_kwargs) -> bytes:
+        """Encode a Pillow image into the reused buffer and return the bytes."""
+        self._buf.seek(0)
+        self._buf.truncate()
+        image.save(self._buf, **save_kwargs)
+        return self._buf.getvalue()
+    
+    def _grab_scrot(self):
+        """Capture the screen with the scrot command."""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "screenshot.png")
+            subprocess.run(['scrot', path], check=True, capture_output=True)
+            with Image.open(path) as image:
+                image.load()
+                return image
+    
+    def _select_image_backend(self):
+        """Probe the Pillow screenshot backends in order and keep the first that works.
+        
+        Returns the first captured image so the probe is not wasted.
+        """
+        backends = []
+        if PYAUTOGUI_AVAILABLE:
+            backends.append(("pyautogui", pyautogui.screenshot))
+            backends.append(("ImageGrab", ImageGrab.grab))
+        if PYSCREENSHOT_AVAILABLE:
+            backends.append(("pyscreenshot", pyscreenshot.grab))
+        backends.append(("scrot", self._grab_scrot))
+        
+        for name, grab in backends:
+            try:
+                screenshot = grab()
+            except Exception as e:
+                logging.warning(f"{name} screenshot failed: {e}")
+                continue
+            if screenshot is not None:
+                logging.info(f"Using {name} for screenshots")
+                self._grab_image = grab
+                return screenshot
+        return None
+    
+    def _screenshot_result(self, output: str, data: bytes, mime_type: str, scale: float) -> Dict[str, Any]:
+        """Build a screenshot result, as base64 or, with SCREENSHOT_DIR set, a file URI."""
+        result = {"output": output, "mime_type": mime_type, "scale": scale}
+        if self._prev_b64 is not None and self._prev_b64[0] is data:
+            # Same bytes object as last time: the grab found no change
+            result["output"] = f"{output}; screen unchanged since the last screenshot"
+        if not SCREENSHOT_DIR:
+            if self._prev_b64 is None or self._prev_b64[0] is not data:
+                self._prev_b64 = (data, b64encode(data).decode('ascii'))
+            result["screenshot"] = self._prev_b64[1]
+            return result
+        self._prev_b64 = (data, None)
+        
+        ext = ".jpg" if mime_type == "image/jpeg" else ".png"
+        slot = next(self._screenshot_seq) % SCREENSHOT_FILES_KEPT
+        path = os.path.join(SCREENSHOT_DIR, f"screenshot-{slot}{ext}")
+        # Write then rename so a reader never sees a partial image
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        result["screenshot_uri"] = Path(path).resolve().as_uri()
+        return result
+    
+    def _take_screenshot(self, scale: float = 1.0, fresh: bool = False) -> Dict[str, Any]:
+        """Take a screenshot and return base64 encoded image.
+        
+        scale (0 < scale <= 1) shrinks the image before encoding; it is echoed
+        in the result, and coordinates read from the image should be sent
+        back with the same scale.
+        At the default scale a background frame is reused when nothing has
+        been input since it was grabbed; fresh=True always grabs directly.
+        """
+        scale = min(max(float(scale), 0.05), 1.0)
+        output = "Screenshot taken successfully"
+        if scale < 1.0:
+            output += f" (scaled by {scale:g}; pass scale={scale:g} with coordinates from this image)"
+        try:
+            # Method 0: mss framebuffer grab + JPEG encode
+            if MSS_AVAILABLE:
                 try:
-                    screenshot = pyautogui.screenshot()
+                    jpeg_bytes = None
+                    if not fresh and scale == SCREENSHOT_SCALE and (TURBOJPEG_AVAILABLE or SIMPLEJPEG_AVAILABLE):
+                        jpeg_bytes = self._background_jpeg()
+                    if jpeg_bytes is None:
+                        jpeg_bytes = self._grab_jpeg(scale)
+                    if jpeg_bytes is not None:
+                        return self._screenshot_result(output, jpeg_bytes, "image/jpeg", scale)
                 except Exception as e:
-                    logging.warning(f"pyautogui screenshot failed: {e}")
+                    logging.warning(f"mss screenshot failed: {e}")
             
-            # Method 2: ImageGrab (pyscreenshot fallback)
-            if screenshot is None:
+            # Pillow fallback: reuse the backend that worked last time and
+            # probe again only if it stops working
+            screenshot = None
+            if self._grab_image is not None:
                 try:
-                    screenshot = ImageGrab.grab()
+                    screenshot = self._grab_image()
                 except Exception as e:
-                    logging.warning(f"ImageGrab failed: {e}")
-                    
-            # Method 3: Use scrot command if available
+                    logging.warning(f"Screenshot backend failed, probing again: {e}")
+                    self._grab_image = None
             if screenshot is None:
-                try:
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                        subprocess.run(['scrot', tmp.name], check=True, capture_output=True)
-                        screenshot = Image.open(tmp.name)
-                        os.unlink(tmp.name)
-                except Exception as e:
-                    logging.warning(f"scrot command failed: {e}")
+                screenshot = self._select_image_backend()
                     
             if screenshot is None:
                 return {"output": "ERROR: Failed to capture screenshot - no method available"}
             
-            # Convert to base64
-            buffer = BytesIO()
-            screenshot.save(buffer, format='PNG')
-            image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            if scale < 1.0:
+                size = (max(1, int(screenshot.width * scale)), max(1, int(screenshot.height * scale)))
+                screenshot = screenshot.resize(size, Image.Resampling.BOX)
             
-            return {
-                "output": "Screenshot taken successfully",
-                "screenshot": image_base64
-            }
+            png_bytes = self._encode_pil(screenshot, format='PNG')
+            return self._screenshot_result(output, png_bytes, "image/png", scale)
             
         except Exception as e:
             logging.error(f"Screenshot error: {e}")
@@ -306,24 +784,24 @@ class ContainerizedComputerUseAPI:
                     return {"output": "ERROR: view command requires path parameter"}
                 
                 # Ensure path is within allowed workspace
-                file_path = Path(path).resolve()
+                file_path = _resolve_path(path)
                 
-                if not file_path.exists():
+                try:
+                    # Apply view range if specified, reading only up to its last line
+                    if view_range and len(view_range) == 2:
+                        start, end = view_range
+                        start = max(1, start) - 1  # Convert to 0-indexed
+                        stop = end if end >= 0 else None  # -1 means through end of file
+                        with file_path.open('r', encoding='utf-8', errors='replace') as f:
+                            lines = [line.rstrip('\n') for line in itertools.islice(f, start, stop)]
+                        end = start + len(lines)
+                        result = '\n'.join(lines)
+                        return {"output": f"Lines {start+1}-{end}:\n{result}"}
+                    else:
+                        content = file_path.read_text(encoding='utf-8')
+                        return {"output": content}
+                except FileNotFoundError:
                     return {"output": f"ERROR: File not found: {path}"}
-                
-                content = file_path.read_text(encoding='utf-8')
-                lines = content.splitlines()
-                
-                # Apply view range if specified
-                if view_range and len(view_range) == 2:
-                    start, end = view_range
-                    start = max(1, start) - 1  # Convert to 0-indexed
-                    end = min(len(lines), end)
-                    lines = lines[start:end]
-                    result = '\n'.join(lines)
-                    return {"output": f"Lines {start+1}-{end}:\n{result}"}
-                else:
-                    return {"output": content}
             
             elif command == "create":
                 path = kwargs.get("path", "")
@@ -332,7 +810,7 @@ class ContainerizedComputerUseAPI:
                 if not path:
                     return {"output": "ERROR: create command requires path parameter"}
                 
-                file_path = Path(path).resolve()
+                file_path = _resolve_path(path)
                 
                 # Create parent directories if needed
                 file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -350,23 +828,30 @@ class ContainerizedComputerUseAPI:
                 if not all([path, old_str]):
                     return {"output": "ERROR: str_replace requires path and old_str parameters"}
                 
-                file_path = Path(path).resolve()
+                file_path = _resolve_path(path)
                 
-                if not file_path.exists():
+                # Read content; ASCII-only edits on files without CR work on
+                # raw bytes, skipping the UTF-8 decode/encode of the whole file
+                try:
+                    data = file_path.read_bytes()
+                except FileNotFoundError:
                     return {"output": f"ERROR: File not found: {path}"}
+                if old_str.isascii() and new_str.isascii() and b"\r" not in data:
+                    sep, replacement = old_str.encode('ascii'), new_str.encode('ascii')
+                else:
+                    data = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+                    sep, replacement = old_str, new_str
                 
-                # Read content
-                content = file_path.read_text(encoding='utf-8')
-                
-                # Check if old_str exists
-                if old_str not in content:
+                # Split once around the first occurrence: finds and replaces in one pass
+                parts = data.split(sep, 1)
+                if len(parts) != 2:
                     return {"output": f"ERROR: String not found in file: {old_str[:50]}..."}
                 
-                # Replace string
-                new_content = content.replace(old_str, new_str, 1)  # Replace first occurrence
-                
                 # Write back
-                file_path.write_text(new_content, encoding='utf-8')
+                if isinstance(data, bytes):
+                    file_path.write_bytes(parts[0] + replacement + parts[1])
+                else:
+                    file_path.write_text(parts[0] + replacement + parts[1], encoding='utf-8')
                 
                 return {"output": f"Replaced string in {path}"}
                 
@@ -376,38 +861,122 @@ class ContainerizedComputerUseAPI:
         except Exception as e:
             logging.error(f"Text editor error: {e}")
             return {"output": f"ERROR: {str(e)}"}
+        finally:
+            # An edit can change a file open on screen
+            if command != "view":
+                self._last_input = time.monotonic()
     
     def bash_20250124(self, command: str) -> Dict[str, Any]:
         """
         Execute bash commands in the container environment.
+        Commands share one persistent shell, so cd and exported variables carry over.
+        """
+        try:
+            return self._run_in_shell(command, BASH_TIMEOUT)
+        except Exception as e:
+            logging.error(f"Bash command error: {e}")
+            return {"output": f"ERROR: {str(e)}"}
+        finally:
+            # Commands can change the screen (e.g. launching an app)
+            self._last_input = time.monotonic()
+    
+    async def bash_20250124_async(self, command: str) -> Dict[str, Any]:
         """
+        Execute bash commands in the container environment without blocking the event loop.
+        """
+        return await asyncio.to_thread(self.bash_20250124, command)
+    
+    def _start_shell(self) -> None:
+        """Start the persistent shell in its own session so a timeout can kill its jobs too."""
+        self._shell = subprocess.Popen(
+            ["/bin/bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.current_directory,
+            start_new_session=True
+        )
+    
+    def _stop_shell(self) -> None:
+        """Kill the persistent shell and everything it started."""
+        shell, self._shell = self._shell, None
+        if shell is None:
+            return
         try:
-            # Set timeout (default 30 seconds)
-            timeout = 30
+            os.killpg(shell.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        shell.wait()
+        for pipe in (shell.stdin, shell.stdout, shell.stderr):
+            pipe.close()
+    
+    def _run_in_shell(self, command: str, timeout: float) -> Dict[str, Any]:
+        """Run one command in the persistent shell and collect its output.
+        
+        The command is passed to eval with stdin from /dev/null, followed by
+        a printf of a unique end marker and the exit status. stdout is read up to
+        the marker; stderr written by the command is already in its pipe by then.
+        """
+        with self._shell_lock:
+            if self._shell is None or self._shell.poll() is not None:
+                self._stop_shell()
+                self._start_shell()
+            shell = self._shell
             
-            # Execute command
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=self.current_directory
+            # The command is read as data through a quoted here-document and
+            # run with eval, so an incomplete command (unclosed quote, trailing
+            # backslash) is a syntax error with a non-zero status instead of
+            # swallowing the marker printf
+            token = uuid.uuid4().hex
+            marker = f"__END_{token}__".encode()
+            delimiter = f"__CMD_{token}__".encode()
+            shell.stdin.write(
+                b"IFS= read -r -d '' __cmd <<'%b'\n%b\n%b\neval \"$__cmd\" </dev/null\n"
+                b"printf '\\n%b %%d\\n' $?\n" % (delimiter, command.encode(), delimiter, marker)
             )
+            shell.stdin.flush()
             
-            output = result.stdout
-            if result.stderr:
-                output += f"\nSTDERR:\n{result.stderr}"
+            out_fd, err_fd = shell.stdout.fileno(), shell.stderr.fileno()
+            stdout, stderr = bytearray(), bytearray()
+            deadline = time.monotonic() + timeout
+            returncode = None
+            open_fds = [out_fd, err_fd]
+            while out_fd in open_fds:
+                end = stdout.find(marker)
+                if end != -1 and stdout.find(b"\n", end) != -1:
+                    returncode = int(stdout[end + len(marker):].split()[0])
+                    del stdout[max(0, end - 1):]  # Drop the marker and the newline before it
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stop_shell()
+                    return {"output": f"ERROR: Command timed out after {timeout} seconds"}
+                for fd in select.select(open_fds, [], [], remaining)[0]:
+                    chunk = os.read(fd, BASH_READ_SIZE)
+                    if not chunk:
+                        open_fds.remove(fd)
+                    (stdout if fd == out_fd else stderr).extend(chunk)
             
-            return {
-                "output": output.strip() if output else f"Command completed with exit code {result.returncode}"
-            }
+            # Collect whatever stderr is already buffered without waiting for more
+            while err_fd in open_fds and select.select([err_fd], [], [], 0)[0]:
+                chunk = os.read(err_fd, BASH_READ_SIZE)
+                if not chunk:
+                    break
+                stderr.extend(chunk)
             
-        except subprocess.TimeoutExpired:
-            return {"output": f"ERROR: Command timed out after {timeout} seconds"}
-        except Exception as e:
-            logging.error(f"Bash command error: {e}")
-            return {"output": f"ERROR: {str(e)}"}
+            if returncode is None:
+                # The shell exited (e.g. the command ran `exit`); start over next time
+                returncode = shell.wait()
+                self._stop_shell()
+        
+        output = stdout.decode(errors='replace')
+        if stderr:
+            output += f"\nSTDERR:\n{stderr.decode(errors='replace')}"
+        
+        return {
+            "output": output.strip() if output else f"Command completed with exit code {returncode}"
+        }
 
 
 # Main execution function for direct testing
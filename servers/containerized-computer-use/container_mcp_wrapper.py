@@ -4,13 +4,35 @@ MCP Server Wrapper for Containerized Computer Use
 Handles JSON-RPC communication and delegates to the Computer Use API
 """
 
+import os
 import sys
 import json
+import zlib
+import base64
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from computer_use_container import ContainerizedComputerUseAPI
 
+# Optional fast JSON; large base64 screenshots dominate the response size
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON-RPC line from raw bytes."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a response to UTF-8 bytes; unknown types fall back to str()."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode()
+
 # Configure logging to stderr only
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +40,106 @@ logging.basicConfig(
     stream=sys.stderr
 )
 
+# Opt-in for clients that understand content_encoding: tool output text above
+# the threshold is sent as raw deflate (level 1) + base64 instead of plain text
+COMPRESS_OUTPUT = bool(os.environ.get("COMPRESS_OUTPUT"))
+COMPRESS_THRESHOLD = 32 * 1024
+
+
+def _maybe_compress(text: str):
+    """Return (text, encoding); encoding is None when the text is sent as-is."""
+    if not COMPRESS_OUTPUT or len(text) <= COMPRESS_THRESHOLD:
+        return text, None
+    compressor = zlib.compressobj(1, zlib.DEFLATED, -15)
+    data = compressor.compress(text.encode("utf-8")) + compressor.flush()
+    return base64.b64encode(data).decode("ascii"), "deflate+base64"
+
+# Bytes requested from stdin per read; requests are split out of each chunk
+STDIN_READ_SIZE = 64 * 1024
+
+
+# Static results, serialized once per server; only the request id varies
+INITIALIZE_RESULT = {
+    "protocolVersion": "0.1.0",
+    "capabilities": {
+        "tools": {},
+        "resources": {}
+    },
+    "serverInfo": {
+        "name": "containerized-computer-use",
+        "version": "1.0.0"
+    }
+}
+
+TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "computer_20250124",
+            "description": "Control computer with actions: screenshot, mouse, keyboard, etc.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "action": {
+                        "type": "string",
+                        "enum": ["screenshot", "key", "type", "mouse_move", "left_click", 
+                               "right_click", "middle_click", "double_click", "triple_click",
+                               "left_click_drag", "scroll", "wait", "cursor_position",
+                               "left_mouse_down", "left_mouse_up", "hold_key", "batch"]
+                    },
+                    "actions": {"type": "array", "items": {"type": "object"}},
+                    "coordinate": {"type": "array", "items": {"type": "integer"}},
+                    "text": {"type": "string"},
+                    "start_coordinate": {"type": "array", "items": {"type": "integer"}},
+                    "end_coordinate": {"type": "array", "items": {"type": "integer"}},
+                    "direction": {"type": "string", "enum": ["up", "down"]},
+                    "clicks": {"type": "integer"},
+                    "duration": {"type": "integer"},
+                    "scale": {"type": "number"},
+                    "fresh": {"type": "boolean"}
+                },
+                "required": ["action"]
+            }
+        },
+        {
+            "name": "text_editor_20250429",
+            "description": "View and edit text files",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "command": {
+                        "type": "string",
+                        "enum": ["view", "create", "str_replace"]
+                    },
+                    "path": {"type": "string"},
+                    "file_text": {"type": "string"},
+                    "old_str": {"type": "string"},
+                    "new_str": {"type": "string"},
+                    "view_range": {"type": "array", "items": {"type": "integer"}}
+                },
+                "required": ["command"]
+            }
+        },
+        {
+            "name": "bash_20250124",
+            "description": "Execute bash commands",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "command": {"type": "string"}
+                },
+                "required": ["command"]
+            }
+        }
+    ]
+}
+
+STATIC_RESULTS = {
+    "initialize": INITIALIZE_RESULT,
+    "tools/list": TOOLS_LIST_RESULT,
+    "resources/list": {"resources": []},
+    "prompts/list": {"prompts": []},
+}
+
 
 class ContainerMCPServer:
     """MCP Server implementation for containerized Computer Use."""
@@ -25,6 +147,10 @@ class ContainerMCPServer:
     def __init__(self):
         self.api = ContainerizedComputerUseAPI()
         self.running = True
+        self._write_lock = asyncio.Lock()
+        self._static_result_bytes = {
+            method: _json_dumps(result) for method, result in STATIC_RESULTS.items()
+        }
         
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming JSON-RPC requests."""
@@ -35,85 +161,11 @@ class ContainerMCPServer:
         logging.info(f"Handling request: {method}")
         
         try:
-            if method == "initialize":
+            if method in STATIC_RESULTS:
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
-                    "result": {
-                        "protocolVersion": "0.1.0",
-                        "capabilities": {
-                            "tools": {},
-                            "resources": {}
-                        },
-                        "serverInfo": {
-                            "name": "containerized-computer-use",
-                            "version": "1.0.0"
-                        }
-                    }
-                }
-            
-            elif method == "tools/list":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "tools": [
-                            {
-                                "name": "computer_20250124",
-                                "description": "Control computer with actions: screenshot, mouse, keyboard, etc.",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "action": {
-                                            "type": "string",
-                                            "enum": ["screenshot", "key", "type", "mouse_move", "left_click", 
-                                                   "right_click", "middle_click", "double_click", "triple_click",
-                                                   "left_click_drag", "scroll", "wait", "cursor_position",
-                                                   "left_mouse_down", "left_mouse_up", "hold_key"]
-                                        },
-                                        "coordinate": {"type": "array", "items": {"type": "integer"}},
-                                        "text": {"type": "string"},
-                                        "start_coordinate": {"type": "array", "items": {"type": "integer"}},
-                                        "end_coordinate": {"type": "array", "items": {"type": "integer"}},
-                                        "direction": {"type": "string", "enum": ["up", "down"]},
-                                        "clicks": {"type": "integer"},
-                                        "duration": {"type": "integer"}
-                                    },
-                                    "required": ["action"]
-                                }
-                            },
-                            {
-                                "name": "text_editor_20250429",
-                                "description": "View and edit text files",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "command": {
-                                            "type": "string",
-                                            "enum": ["view", "create", "str_replace"]
-                                        },
-                                        "path": {"type": "string"},
-                                        "file_text": {"type": "string"},
-                                        "old_str": {"type": "string"},
-                                        "new_str": {"type": "string"},
-                                        "view_range": {"type": "array", "items": {"type": "integer"}}
-                                    },
-                                    "required": ["command"]
-                                }
-                            },
-                            {
-                                "name": "bash_20250124",
-                                "description": "Execute bash commands",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "command": {"type": "string"}
-                                    },
-                                    "required": ["command"]
-                                }
-                            }
-                        ]
-                    }
+                    "result": STATIC_RESULTS[method]
                 }
             
             elif method == "tools/call":
@@ -125,40 +177,41 @@ class ContainerMCPServer:
                 elif tool_name == "text_editor_20250429":
                     result = self.api.text_editor_20250429(**arguments)
                 elif tool_name == "bash_20250124":
-                    result = self.api.bash_20250124(**arguments)
+                    result = await self.api.bash_20250124_async(**arguments)
                 else:
                     result = {"output": f"ERROR: Unknown tool: {tool_name}"}
                 
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": result.get("output", "")
-                            }
-                        ] + ([{
-                            "type": "image",
-                            "data": result["screenshot"]
-                        }] if "screenshot" in result else [])
+                text, encoding = _maybe_compress(result.get("output", ""))
+                content = [
+                    {
+                        "type": "text",
+                        "text": text
                     }
-                }
-            
-            elif method == "resources/list":
+                ]
+                if encoding:
+                    content[0]["content_encoding"] = encoding
+                if "screenshot" in result:
+                    content.append({
+                        "type": "image",
+                        "data": result["screenshot"],
+                        "mimeType": result.get("mime_type", "image/png")
+                    })
+                elif "screenshot_uri" in result:
+                    # Written to SCREENSHOT_DIR; the client reads the file itself
+                    content.append({
+                        "type": "resource",
+                        "resource": {
+                            "uri": result["screenshot_uri"],
+                            "mimeType": result.get("mime_type", "image/png")
+                        }
+                    })
+                
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
-                    "result": {"resources": []}
+                    "result": {"content": content}
                 }
             
-            elif method == "prompts/list":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {"prompts": []}
-                }
-                
             elif method == "shutdown":
                 self.running = False
                 return {
@@ -188,46 +241,127 @@ class ContainerMCPServer:
                 }
             }
     
+    async def _write_response(self, response: Dict[str, Any]) -> None:
+        """Serialize and write one JSON-RPC response."""
+        await self._write_line(_json_dumps(response))
+    
+    async def _write_line(self, data: bytes) -> None:
+        """Write one response line; the lock keeps lines from interleaving."""
+        async with self._write_lock:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.write(b"\n")
+            sys.stdout.buffer.flush()
+    
+    async def _handle_and_write(self, request: Dict[str, Any]) -> None:
+        """Handle a request and send its response.
+        
+        Static methods are answered by splicing the request id into the
+        pre-serialized result instead of building and encoding a dict.
+        """
+        try:
+            method = request.get("method")
+            result_bytes = self._static_result_bytes.get(method)
+            if result_bytes is not None:
+                logging.info(f"Handling request: {method}")
+                await self._write_line(b'{"jsonrpc":"2.0","id":%b,"result":%b}' % (
+                    _json_dumps(request.get("id")), result_bytes
+                ))
+                return
+            
+            response = await self.handle_request(request)
+            await self._write_response(response)
+        except Exception as e:
+            logging.error(f"Server error: {e}")
+    
+    async def _handle_batch_and_write(self, batch: List[Any]) -> None:
+        """Handle a JSON-RPC batch and send all responses as one array.
+        
+        Entries are handled one after another, so GUI actions in a batch run
+        in the order they were sent.
+        """
+        try:
+            if not batch:
+                await self._write_response({
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32600, "message": "Invalid Request"}
+                })
+                return
+            
+            responses = []
+            for request in batch:
+                if isinstance(request, dict):
+                    responses.append(await self.handle_request(request))
+                else:
+                    responses.append({
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {"code": -32600, "message": "Invalid Request"}
+                    })
+            await self._write_line(_json_dumps(responses))
+        except Exception as e:
+            logging.error(f"Server error: {e}")
+    
     async def run(self):
-        """Main server loop."""
+        """Main server loop.
+        
+        stdin is read in bulk chunks and split into lines here; each request
+        is handled in its own task so a slow tool call does not hold up the
+        requests queued behind it.
+        """
         logging.info("Container MCP Server starting...")
         
-        reader = asyncio.StreamReader()
+        reader = asyncio.StreamReader(limit=STDIN_READ_SIZE)
         protocol = asyncio.StreamReaderProtocol(reader)
         await asyncio.get_event_loop().connect_read_pipe(
             lambda: protocol, sys.stdin
         )
+        pending = set()
+        buf = bytearray()
         
         while self.running:
-            try:
-                # Read line from stdin
-                line = await reader.readline()
-                if not line:
-                    break
+            chunk = await reader.read(STDIN_READ_SIZE)
+            if not chunk:
+                break
+            buf += chunk
+            
+            while self.running and (nl := buf.find(b"\n")) != -1:
+                line = bytes(buf[:nl])
+                del buf[:nl + 1]
+                if not line.strip():
+                    continue
                 
                 # Parse JSON-RPC request
-                request = json.loads(line.decode())
-                
-                # Handle request
-                response = await self.handle_request(request)
+                try:
+                    request = _json_loads(line)
+                except json.JSONDecodeError as e:
+                    logging.error(f"Invalid JSON: {e}")
+                    await self._write_response({
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {
+                            "code": -32700,
+                            "message": "Parse error"
+                        }
+                    })
+                    continue
                 
-                # Send response
-                print(json.dumps(response), flush=True)
+                # Shutdown waits for in-flight requests, then stops the loop
+                if isinstance(request, dict) and request.get("method") == "shutdown":
+                    if pending:
+                        await asyncio.gather(*pending, return_exceptions=True)
+                    await self._handle_and_write(request)
+                    break
                 
-            except json.JSONDecodeError as e:
-                logging.error(f"Invalid JSON: {e}")
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Parse error"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-            except Exception as e:
-                logging.error(f"Server error: {e}")
+                if isinstance(request, list):
+                    task = asyncio.create_task(self._handle_batch_and_write(request))
+                else:
+                    task = asyncio.create_task(self._handle_and_write(request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
         
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
         logging.info("Container MCP Server shutting down...")
 
 
@@ -8,19 +8,48 @@ offering enhanced security and cross-platform compatibility.
 """
 
 import json
+import base64
 import asyncio
 import logging
-import subprocess
 import sys
+import time
+import errno
+import random
+import socket
+import functools
+import itertools
+import threading
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import docker
-from pathlib import Path
+import requests
+from docker.utils import socket as docker_socket
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ImageContent
 
+# Optional fast JSON; worker responses carry large base64 screenshots
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON from raw bytes."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 bytes; unknown types fall back to str()."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode()
+
 # Configure logging to stderr only
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +57,234 @@ logging.basicConfig(
     stream=sys.stderr
 )
 
+# Connections kept per Docker client; rapid tool calls otherwise exhaust the
+# default pool (and npipe instances on Windows)
+DOCKER_POOL_SIZE = 20
+
+IMAGE_NAME = "containerized-computer-use:latest"
+
+# Retries for transient Docker connection errors: attempts after the first,
+# and the base of the exponential backoff in seconds
+DOCKER_RETRIES = 3
+DOCKER_RETRY_BASE = 0.1
+
+# Errors meaning the daemon never saw the request (safe to retry anything),
+# and errors after which only idempotent calls are retried
+ERROR_PIPE_BUSY = 231  # Windows: "All pipe instances are busy"
+CONNECT_ERRNOS = frozenset({errno.ECONNREFUSED, errno.EAGAIN, errno.EBUSY})
+TRANSIENT_ERRNOS = frozenset({errno.ECONNRESET, errno.ECONNABORTED, errno.EPIPE})
+TRANSIENT_STATUS_CODES = frozenset({500, 502, 503})
+
+
+def _is_transient(error: Exception, idempotent: bool) -> bool:
+    """Whether a failed Docker call may be retried."""
+    code = getattr(error, "winerror", None) or getattr(error, "errno", None)
+    if code is None and error.args and isinstance(error.args[0], int):
+        code = error.args[0]  # pywintypes.error from the npipe transport
+    if code == ERROR_PIPE_BUSY or code in CONNECT_ERRNOS:
+        return True
+    if not idempotent:
+        return False
+    if isinstance(error, docker.errors.APIError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return True
+    return code in TRANSIENT_ERRNOS
+
+
+# Container tool calls in flight at once; Docker API calls in general are
+# bounded by the connection pool size so the pool is never oversubscribed
+EXEC_CONCURRENCY = 4
+
+# Seconds a container_status result (including its stats sample) is reused
+STATUS_CACHE_TTL = 2.0
+
+# Long-lived JSON-RPC worker inside the container, attached over a docker exec
+# socket; it keeps one ContainerizedComputerUseAPI alive across tool calls
+WORKER_COMMAND = ["python3", "/app/container_mcp_wrapper.py"]
+WORKER_TIMEOUT = 60
+
+# One-off fallback: reads a single JSON request line from stdin
+DISPATCH_COMMAND = ["python3", "/app/dispatch.py"]
+
+# Host-side files next to this script, resolved once at import
+SERVER_DIR = Path(__file__).parent
+COMPOSE_PATH = str(SERVER_DIR / "docker-compose.yml")
+
+# Shared bind mount; when it is in place the worker writes screenshots there
+# and the host reads the raw image instead of a base64 string through the pipe
+SHARED_HOST_DIR = SERVER_DIR / "shared"
+SHARED_CONTAINER_DIR = PurePosixPath("/app/shared")
+WORKER_SCREENSHOT_DIR = SHARED_CONTAINER_DIR / "screenshots"
+
+# Bind mounts of a newly created container
+CONTAINER_VOLUMES = {
+    str(SHARED_HOST_DIR): {'bind': str(SHARED_CONTAINER_DIR), 'mode': 'rw'},
+    str(SERVER_DIR / "workspaces"): {'bind': '/app/workspaces', 'mode': 'rw'}
+}
+
+# container_logs returns at most MAX_LOG_LINES lines; output larger than
+# LOG_INLINE_LIMIT bytes is written to a file under LOG_HOST_DIR instead.
+# Files are reused round-robin so the directory stays bounded.
+MAX_LOG_LINES = 500
+LOG_INLINE_LIMIT = 1024 * 1024
+LOG_HOST_DIR = SHARED_HOST_DIR / "logs"
+LOG_FILES_KEPT = 8
+_LOG_FILE_SEQ = itertools.count()
+
+# Seconds container_status waits for the first sample of a new stats stream
+STATS_FIRST_SAMPLE_TIMEOUT = 3.0
+
+# A stats sample younger than this proves the container is still running, so
+# container_status can skip its inspect call
+STATS_FRESH_AGE = 3.0
+
+# Tool definitions, built once and returned as-is for every list_tools request
+TOOLS = [
+    Tool(
+        name="computer_20250124",
+        description="Control computer with actions like screenshot, mouse, keyboard operations",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["screenshot", "key", "type", "mouse_move", "left_click", 
+                           "right_click", "middle_click", "double_click", "triple_click",
+                           "left_click_drag", "scroll", "wait", "cursor_position",
+                           "left_mouse_down", "left_mouse_up", "hold_key"],
+                    "description": "The action to perform"
+                },
+                "coordinate": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Coordinates [x, y] for mouse operations"
+                },
+                "text": {
+                    "type": "string",
+                    "description": "Text for keyboard operations or key combos"
+                },
+                "start_coordinate": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Start coordinates for drag operations"
+                },
+                "end_coordinate": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "End coordinates for drag operations"
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["up", "down"],
+                    "description": "Scroll direction"
+                },
+                "clicks": {
+                    "type": "integer",
+                    "description": "Number of scroll clicks"
+                },
+                "duration": {
+                    "type": "integer",
+                    "description": "Duration in milliseconds"
+                },
+                "scale": {
+                    "type": "number",
+                    "description": "Screenshot scale; for other actions, the scale of the screenshot the coordinates were read from (default 1, screen pixels)"
+                }
+            },
+            "required": ["action"]
+        }
+    ),
+    Tool(
+        name="text_editor_20250429",
+        description="View and edit text files within the container",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "enum": ["view", "create", "str_replace"],
+                    "description": "The command to execute"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "File path within the container"
+                },
+                "file_text": {
+                    "type": "string",
+                    "description": "Content for file creation"
+                },
+                "old_str": {
+                    "type": "string",
+                    "description": "String to replace"
+                },
+                "new_str": {
+                    "type": "string",
+                    "description": "Replacement string"
+                },
+                "view_range": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Line range to view [start, end]"
+                }
+            },
+            "required": ["command"]
+        }
+    ),
+    Tool(
+        name="bash_20250124",
+        description="Execute bash commands in the container",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "Bash command to execute"
+                }
+            },
+            "required": ["command"]
+        }
+    ),
+    Tool(
+        name="container_status",
+        description="Check the status of the Docker container",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="container_start",
+        description="Start the Computer Use container",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="container_stop",
+        description="Stop the Computer Use container",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="container_logs",
+        description="Get recent logs from the container",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "lines": {
+                    "type": "integer",
+                    "description": f"Number of log lines to retrieve (at most {MAX_LOG_LINES})",
+                    "default": 50
+                }
+            }
+        }
+    )
+]
+
 class ContainerizedComputerUseMCP:
     """MCP Server for containerized Computer Use with Docker integration."""
     
@@ -35,25 +292,57 @@ class ContainerizedComputerUseMCP:
         self.server = Server("containerized-computer-use")
         self.container_name = "windows-computer-use"
         self.docker_client = None
-        self.container = None
+        self.container = None  # Cached Container object, see _get_container()
         
-        # Initialize Docker client
-        try:
-            # Try to connect to Docker Desktop on Windows
-            self.docker_client = docker.DockerClient(base_url='npipe://./pipe/docker_engine')
-            # Test the connection
-            self.docker_client.ping()
-            logging.info("Docker client initialized successfully")
-        except Exception as e:
-            logging.error(f"Failed to initialize Docker client: {e}")
-            try:
-                # Fallback to default environment
-                self.docker_client = docker.from_env()
-                self.docker_client.ping()
-                logging.info("Docker client initialized via fallback method")
-            except Exception as e2:
-                logging.error(f"Docker fallback also failed: {e2}")
-                self.docker_client = None
+        # Last full status result and when it was taken; see STATUS_CACHE_TTL
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        
+        # Concurrency limits, see EXEC_CONCURRENCY and DOCKER_POOL_SIZE
+        self._exec_sem = asyncio.Semaphore(EXEC_CONCURRENCY)
+        self._docker_sem = asyncio.Semaphore(DOCKER_POOL_SIZE)
+        
+        # Created/ports from the last inspect; they only change when the
+        # container is (re)created, so they are dropped on start and stop
+        self._cached_attrs = None
+        
+        # Set while the container is known to be running (after a start or a
+        # successful tool call); cleared when it stops, vanishes or a call fails
+        self._container_warm = False
+        
+        # Set once IMAGE_NAME is known to exist; cleared if creating fails with ImageNotFound
+        self._image_verified = False
+        
+        # In-container worker: attach socket, request ids, and futures of
+        # requests awaiting a response, keyed by id
+        self._worker = None
+        self._worker_lock = asyncio.Lock()
+        self._worker_send_lock = threading.Lock()
+        self._worker_ids = itertools.count(1)
+        self._worker_pending = {}
+        
+        # Background stats stream: latest decoded sample, set once one has
+        # arrived, and the stop flag of the running reader (None if none)
+        self._last_stats = None
+        self._last_stats_at = 0.0
+        self._stats_ready = threading.Event()
+        self._stats_stop = None
+        # (sample, (cpu, memory)) for the last sample formatted, see _format_usage()
+        self._usage_cache = None
+        
+        # Docker is connected on first use, see _ensure_docker()
+        self._docker_init_lock = asyncio.Lock()
+        
+        # Tool name -> coroutine taking the call arguments
+        self._handlers = {
+            "container_status": lambda args: self._get_container_status(),
+            "container_start": lambda args: self._start_container(),
+            "container_stop": lambda args: self._stop_container(),
+            "container_logs": lambda args: self._get_container_logs(args.get("lines", 50)),
+        }
+        # Computer Use API tools - delegate to container
+        for tool_name in ("computer_20250124", "text_editor_20250429", "bash_20250124"):
+            self._handlers[tool_name] = functools.partial(self._execute_in_container, tool_name)
         self._register_tools()
         
     def _register_tools(self):
@@ -62,146 +351,7 @@ class ContainerizedComputerUseMCP:
         @self.server.list_tools()
         async def handle_list_tools() -> List[Tool]:
             """List all available tools."""
-            return [
-                Tool(
-                    name="computer_20250124",
-                    description="Control computer with actions like screenshot, mouse, keyboard operations",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "action": {
-                                "type": "string",
-                                "enum": ["screenshot", "key", "type", "mouse_move", "left_click", 
-                                       "right_click", "middle_click", "double_click", "triple_click",
-                                       "left_click_drag", "scroll", "wait", "cursor_position",
-                                       "left_mouse_down", "left_mouse_up", "hold_key"],
-                                "description": "The action to perform"
-                            },
-                            "coordinate": {
-                                "type": "array",
-                                "items": {"type": "integer"},
-                                "description": "Coordinates [x, y] for mouse operations"
-                            },
-                            "text": {
-                                "type": "string",
-                                "description": "Text for keyboard operations or key combos"
-                            },
-                            "start_coordinate": {
-                                "type": "array",
-                                "items": {"type": "integer"},
-                                "description": "Start coordinates for drag operations"
-                            },
-                            "end_coordinate": {
-                                "type": "array",
-                                "items": {"type": "integer"},
-                                "description": "End coordinates for drag operations"
-                            },
-                            "direction": {
-                                "type": "string",
-                                "enum": ["up", "down"],
-                                "description": "Scroll direction"
-                            },
-                            "clicks": {
-                                "type": "integer",
-                                "description": "Number of scroll clicks"
-                            },
-                            "duration": {
-                                "type": "integer",
-                                "description": "Duration in milliseconds"
-                            }
-                        },
-                        "required": ["action"]
-                    }
-                ),
-                Tool(
-                    name="text_editor_20250429",
-                    description="View and edit text files within the container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "command": {
-                                "type": "string",
-                                "enum": ["view", "create", "str_replace"],
-                                "description": "The command to execute"
-                            },
-                            "path": {
-                                "type": "string",
-                                "description": "File path within the container"
-                            },
-                            "file_text": {
-                                "type": "string",
-                                "description": "Content for file creation"
-                            },
-                            "old_str": {
-                                "type": "string",
-                                "description": "String to replace"
-                            },
-                            "new_str": {
-                                "type": "string",
-                                "description": "Replacement string"
-                            },
-                            "view_range": {
-                                "type": "array",
-                                "items": {"type": "integer"},
-                                "description": "Line range to view [start, end]"
-                            }
-                        },
-                        "required": ["command"]
-                    }
-                ),
-                Tool(
-                    name="bash_20250124",
-                    description="Execute bash commands in the container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "command": {
-                                "type": "string",
-                                "description": "Bash command to execute"
-                            }
-                        },
-                        "required": ["command"]
-                    }
-                ),
-                Tool(
-                    name="container_status",
-                    description="Check the status of the Docker container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {}
-                    }
-                ),
-                Tool(
-                    name="container_start",
-                    description="Start the Computer Use container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {}
-                    }
-                ),
-                Tool(
-                    name="container_stop",
-                    description="Stop the Computer Use container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {}
-                    }
-                ),
-                Tool(
-                    name="container_logs",
-                    description="Get recent logs from the container",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "lines": {
-                                "type": "integer",
-                                "description": "Number of log lines to retrieve",
-                                "default": 50
-                            }
-                        }
-                    }
-                )
-            ]
+            return TOOLS
         
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
@@ -209,20 +359,9 @@ class ContainerizedComputerUseMCP:
             logging.info(f"Executing tool: {name} with arguments: {arguments}")
             
             try:
-                # Container management tools
-                if name == "container_status":
-                    result = await self._get_container_status()
-                elif name == "container_start":
-                    result = await self._start_container()
-                elif name == "container_stop":
-                    result = await self._stop_container()
-                elif name == "container_logs":
-                    lines = arguments.get("lines", 50)
-                    result = await self._get_container_logs(lines)
-                
-                # Computer Use API tools - delegate to container
-                elif name in ["computer_20250124", "text_editor_20250429", "bash_20250124"]:
-                    result = await self._execute_in_container(name, arguments)
+                handler = self._handlers.get(name)
+                if handler is not None:
+                    result = await handler(arguments or {})
                 else:
                     result = {"output": f"ERROR: Unknown tool: {name}"}
                 
@@ -231,52 +370,157 @@ class ContainerizedComputerUseMCP:
                     # Return both text and image content
                     return [
                         TextContent(type="text", text=result.get("output", "Screenshot captured")),
-                        ImageContent(type="image", data=result["screenshot"], mimeType="image/png")
+                        ImageContent(type="image", data=result["screenshot"], mimeType=result.get("mime_type", "image/png"))
                     ]
                 else:
-                    return [TextContent(type="text", text=json.dumps(result))]
+                    return [TextContent(type="text", text=_json_dumps(result).decode())]
                     
             except Exception as e:
                 logging.error(f"Error executing tool {name}: {e}")
                 error_result = {"output": f"ERROR: {str(e)}"}
-                return [TextContent(type="text", text=json.dumps(error_result))]
+                return [TextContent(type="text", text=_json_dumps(error_result).decode())]
+    
+    async def _ensure_docker(self) -> bool:
+        """Connect the Docker client on first use; returns whether one is available.
+        
+        A failed attempt is retried on the next call, so Docker Desktop may be
+        started after the server.
+        """
+        if self.docker_client is not None:
+            return True
+        async with self._docker_init_lock:
+            if self.docker_client is None:
+                self.docker_client = await asyncio.to_thread(self._connect_docker)
+        return self.docker_client is not None
+    
+    @staticmethod
+    def _connect_docker():
+        """Create and ping a Docker client, or return None."""
+        try:
+            # Try to connect to Docker Desktop on Windows
+            client = docker.DockerClient(
+                base_url='npipe://./pipe/docker_engine', max_pool_size=DOCKER_POOL_SIZE
+            )
+            # Test the connection
+            client.ping()
+            logging.info("Docker client initialized successfully")
+            return client
+        except Exception as e:
+            logging.error(f"Failed to initialize Docker client: {e}")
+            try:
+                # Fallback to default environment
+                client = docker.from_env(max_pool_size=DOCKER_POOL_SIZE)
+                client.ping()
+                logging.info("Docker client initialized via fallback method")
+                return client
+            except Exception as e2:
+                logging.error(f"Docker fallback also failed: {e2}")
+                return None
+    
+    async def _with_retry(self, fn, *args, idempotent: bool = True, **kwargs):
+        """Run a blocking Docker call in a thread, retrying transient errors with backoff.
+        
+        Non-idempotent calls (exec, create) are retried only when the error
+        shows the daemon never received the request.
+        """
+        for attempt in range(DOCKER_RETRIES + 1):
+            try:
+                async with self._docker_sem:
+                    return await asyncio.to_thread(fn, *args, **kwargs)
+            except Exception as e:
+                if attempt == DOCKER_RETRIES or not _is_transient(e, idempotent):
+                    raise
+                delay = DOCKER_RETRY_BASE * 2 ** attempt + random.uniform(0, 0.05)
+                logging.warning(f"Transient Docker error, retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    def _get_container(self, refresh: bool = False):
+        """Return the cached Container object, fetching it by name if needed.
+        
+        refresh=True reloads its attributes (one inspect). A NotFound clears
+        the cache and propagates.
+        """
+        try:
+            if self.container is None:
+                self.container = self.docker_client.containers.get(self.container_name)
+            elif refresh:
+                self.container.reload()
+        except docker.errors.NotFound:
+            self.container = None
+            raise
+        return self.container
+    
+    async def _is_container_running(self) -> bool:
+        """Cheap running check: one inspect, no stats sample."""
+        try:
+            container = await self._with_retry(self._get_container, True)
+        except docker.errors.NotFound:
+            return False
+        return container.status == "running"
+    
+    def _invalidate_status(self) -> None:
+        """Drop the cached status and warm flag after the container is started or stopped."""
+        self._status_cache = None
+        self._cached_attrs = None
+        self._container_warm = False
     
     async def _get_container_status(self) -> Dict[str, Any]:
-        """Check if the container is running."""
+        """Check if the container is running, reusing a result younger than STATUS_CACHE_TTL."""
+        if self._status_cache is not None and time.monotonic() - self._status_cache_ts < STATUS_CACHE_TTL:
+            return self._status_cache
+        
+        status = await self._get_container_status_full()
+        if not status.get("output", "").startswith("ERROR"):
+            self._status_cache = status
+            self._status_cache_ts = time.monotonic()
+        return status
+    
+    async def _get_container_status_full(self) -> Dict[str, Any]:
+        """Inspect the container and sample its resource usage."""
         try:
-            if not self.docker_client:
+            if not await self._ensure_docker():
                 return {"output": "ERROR: Docker client not initialized"}
             
             try:
-                container = self.docker_client.containers.get(self.container_name)
-                status = container.status
-                attrs = container.attrs
-                
-                # Get resource stats
-                stats = container.stats(stream=False)
+                stats_fresh = (
+                    self._last_stats is not None
+                    and time.monotonic() - self._last_stats_at < STATS_FRESH_AGE
+                )
+                if stats_fresh and self._cached_attrs is not None and self.container is not None:
+                    # The stats stream only delivers samples while the container runs
+                    container = self.container
+                    status = "running"
+                else:
+                    container = await self._with_retry(self._get_container, True)
+                    status = container.status
+                    attrs = container.attrs
+                    self._cached_attrs = {
+                        "created": attrs['Created'],
+                        "ports": attrs['NetworkSettings']['Ports']
+                    }
                 
-                # Calculate resource usage
-                cpu_percent = 0.0
-                if stats['cpu_stats']['cpu_usage']['total_usage'] > 0:
-                    cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage']['total_usage']
-                    system_delta = stats['cpu_stats']['system_cpu_usage'] - stats['precpu_stats']['system_cpu_usage']
-                    if system_delta > 0:
-                        cpu_percent = (cpu_delta / system_delta) * 100.0
+                # Resource stats come from the background stream
+                stats = None
+                if status == "running":
+                    self._start_stats_stream(container)
+                    if self._last_stats is None:
+                        await asyncio.to_thread(self._stats_ready.wait, STATS_FIRST_SAMPLE_TIMEOUT)
+                    stats = self._last_stats
                 
-                memory_usage = stats['memory_stats']['usage'] / (1024 * 1024)  # MB
-                memory_limit = stats['memory_stats']['limit'] / (1024 * 1024)  # MB
+                cpu_usage, memory = self._format_usage(stats)
                 
                 return {
                     "output": f"Container Status: {status.upper()}",
                     "status": status,
                     "id": container.short_id,
-                    "created": attrs['Created'],
-                    "ports": attrs['NetworkSettings']['Ports'],
-                    "cpu_percent": f"{cpu_percent:.2f}%",
-                    "memory_usage": f"{memory_usage:.2f}MB / {memory_limit:.2f}MB",
+                    "created": self._cached_attrs["created"],
+                    "ports": self._cached_attrs["ports"],
+                    "cpu_percent": cpu_usage,
+                    "memory_usage": memory,
                     "vnc_url": "vnc://localhost:5900" if status == "running" else None
                 }
             except docker.errors.NotFound:
+                self.container = None
                 return {
                     "output": "Container not found. Run 'container_start' to create it.",
                     "status": "not_found"
@@ -285,62 +529,120 @@ class ContainerizedComputerUseMCP:
             logging.error(f"Error checking container status: {e}")
             return {"output": f"ERROR: Failed to check container status: {str(e)}"}
     
+    def _format_usage(self, stats) -> tuple:
+        """Return (cpu, memory) strings for a stats sample, "n/a" if it has none.
+        
+        The stream replaces the sample about once a second, so status calls in
+        between reuse the strings computed for it.
+        """
+        if stats is None:
+            return "n/a", "n/a"
+        if self._usage_cache is not None and self._usage_cache[0] is stats:
+            return self._usage_cache[1]
+        
+        cpu_usage = memory = "n/a"
+        if stats.get('memory_stats', {}).get('usage') is not None:
+            # Calculate resource usage
+            cpu_percent = 0.0
+            if stats['cpu_stats']['cpu_usage']['total_usage'] > 0:
+                cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage']['total_usage']
+                system_delta = stats['cpu_stats'].get('system_cpu_usage', 0) - stats['precpu_stats'].get('system_cpu_usage', 0)
+                if system_delta > 0:
+                    cpu_percent = (cpu_delta / system_delta) * 100.0
+            
+            memory_usage = stats['memory_stats']['usage'] / (1024 * 1024)  # MB
+            memory_limit = stats['memory_stats']['limit'] / (1024 * 1024)  # MB
+            cpu_usage = f"{cpu_percent:.2f}%"
+            memory = f"{memory_usage:.2f}MB / {memory_limit:.2f}MB"
+        
+        self._usage_cache = (stats, (cpu_usage, memory))
+        return cpu_usage, memory
+    
+    def _start_stats_stream(self, container) -> None:
+        """Start the background stats reader for container unless one is running."""
+        if self._stats_stop is not None:
+            return
+        stop = threading.Event()
+        self._stats_stop = stop
+        self._last_stats = None
+        self._stats_ready.clear()
+        threading.Thread(
+            target=self._read_stats_stream,
+            args=(container, stop),
+            name="container-stats",
+            daemon=True
+        ).start()
+    
+    def _read_stats_stream(self, container, stop: threading.Event) -> None:
+        """Keep the newest stats sample in self._last_stats until stopped or the stream ends.
+        
+        Docker sends a sample about once a second, so a stop request takes
+        effect within that time.
+        """
+        try:
+            for sample in container.stats(stream=True, decode=True):
+                if stop.is_set():
+                    break
+                self._last_stats = sample
+                self._last_stats_at = time.monotonic()
+                self._stats_ready.set()
+        except Exception as e:
+            logging.warning(f"Container stats stream ended: {e}")
+        finally:
+            if self._stats_stop is stop:
+                self._stats_stop = None
+                self._last_stats = None
+                self._stats_ready.clear()
+    
+    def _stop_stats_stream(self) -> None:
+        """Ask the background stats reader to exit."""
+        stop, self._stats_stop = self._stats_stop, None
+        if stop is not None:
+            stop.set()
+        self._last_stats = None
+        self._stats_ready.clear()
+    
     async def _start_container(self) -> Dict[str, Any]:
         """Start the Computer Use container."""
         try:
-            if not self.docker_client:
+            if not await self._ensure_docker():
                 return {"output": "ERROR: Docker client not initialized"}
             
+            self._invalidate_status()
+            
             # Check if container exists
             try:
-                container = self.docker_client.containers.get(self.container_name)
+                container = await self._with_retry(self._get_container, True)
                 if container.status == "running":
+                    self._container_warm = True
                     return {"output": "Container is already running"}
                 else:
-                    container.start()
+                    await self._with_retry(container.start)
                     await asyncio.sleep(3)  # Wait for services to start
+                    self._container_warm = True
                     return {"output": "Container started successfully"}
             except docker.errors.NotFound:
                 # Container doesn't exist, create it
                 logging.info("Container not found, creating new container...")
                 
                 # Build image if needed
-                image_name = "containerized-computer-use:latest"
-                try:
-                    self.docker_client.images.get(image_name)
-                except docker.errors.ImageNotFound:
-                    logging.info("Building Docker image...")
-                    # Use docker-compose to build
-                    compose_path = Path(__file__).parent / "docker-compose.yml"
-                    result = subprocess.run(
-                        ["docker-compose", "-f", str(compose_path), "build"],
-                        capture_output=True,
-                        text=True
-                    )
-                    if result.returncode != 0:
-                        return {"output": f"ERROR: Failed to build image: {result.stderr}"}
+                error = await self._ensure_image()
+                if error:
+                    return {"output": error}
                 
                 # Create and start container
-                container = self.docker_client.containers.run(
-                    image_name,
-                    name=self.container_name,
-                    detach=True,
-                    ports={'5900/tcp': 5900},
-                    environment={
-                        'DISPLAY': ':1',
-                        'VNC_RESOLUTION': '1920x1080',
-                        'VNC_PW': 'vnc123'
-                    },
-                    volumes={
-                        str(Path(__file__).parent / "shared"): {'bind': '/app/shared', 'mode': 'rw'},
-                        str(Path(__file__).parent / "workspaces"): {'bind': '/app/workspaces', 'mode': 'rw'}
-                    },
-                    mem_limit="4g",
-                    cpu_quota=200000,  # 2 CPUs
-                    remove=False
-                )
+                try:
+                    self.container = await self._with_retry(self._run_container, idempotent=False)
+                except docker.errors.ImageNotFound:
+                    # Removed since it was verified; check (and build) again
+                    self._image_verified = False
+                    error = await self._ensure_image()
+                    if error:
+                        return {"output": error}
+                    self.container = await self._with_retry(self._run_container, idempotent=False)
                 
                 await asyncio.sleep(5)  # Wait for services to fully start
+                self._container_warm = True
                 return {
                     "output": "Container created and started successfully",
                     "vnc_url": "vnc://localhost:5900",
@@ -351,17 +653,64 @@ class ContainerizedComputerUseMCP:
             logging.error(f"Error starting container: {e}")
             return {"output": f"ERROR: Failed to start container: {str(e)}"}
     
+    async def _ensure_image(self) -> Optional[str]:
+        """Make sure IMAGE_NAME exists, building it with docker-compose if not.
+        
+        Returns an error message, or None on success. Checked once per process.
+        """
+        if self._image_verified:
+            return None
+        try:
+            await self._with_retry(self.docker_client.images.get, IMAGE_NAME)
+        except docker.errors.ImageNotFound:
+            logging.info("Building Docker image...")
+            # Use docker-compose to build
+            # Runs without blocking the event loop; the build log on stdout is
+            # not needed, so it is discarded instead of buffered
+            proc = await asyncio.create_subprocess_exec(
+                "docker-compose", "-f", COMPOSE_PATH, "build",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                return f"ERROR: Failed to build image: {stderr.decode(errors='replace')}"
+        self._image_verified = True
+        return None
+    
+    def _run_container(self):
+        """Create and start the container from IMAGE_NAME."""
+        return self.docker_client.containers.run(
+            IMAGE_NAME,
+            name=self.container_name,
+            detach=True,
+            ports={'5900/tcp': 5900},
+            environment={
+                'DISPLAY': ':1',
+                'VNC_RESOLUTION': '1920x1080',
+                'VNC_PW': 'vnc123'
+            },
+            volumes=CONTAINER_VOLUMES,
+            mem_limit="4g",
+            cpu_quota=200000,  # 2 CPUs
+            remove=False
+        )
+    
     async def _stop_container(self) -> Dict[str, Any]:
         """Stop the Computer Use container."""
         try:
-            if not self.docker_client:
+            if not await self._ensure_docker():
                 return {"output": "ERROR: Docker client not initialized"}
                 
-            container = self.docker_client.containers.get(self.container_name)
-            container.stop(timeout=10)
+            self._invalidate_status()
+            self._close_worker()
+            self._stop_stats_stream()
+            container = await self._with_retry(self._get_container)
+            await self._with_retry(container.stop, timeout=10)
             return {"output": "Container stopped successfully"}
             
         except docker.errors.NotFound:
+            self.container = None
             return {"output": "Container not found"}
         except Exception as e:
             logging.error(f"Error stopping container: {e}")
@@ -370,37 +719,98 @@ class ContainerizedComputerUseMCP:
     async def _get_container_logs(self, lines: int = 50) -> Dict[str, Any]:
         """Get recent logs from the container."""
         try:
-            if not self.docker_client:
+            if not await self._ensure_docker():
                 return {"output": "ERROR: Docker client not initialized"}
                 
-            container = self.docker_client.containers.get(self.container_name)
-            logs = container.logs(tail=lines, timestamps=True).decode('utf-8')
+            lines = max(0, min(int(lines), MAX_LOG_LINES))
+            container = await self._with_retry(self._get_container)
+            logs, log_file = await self._with_retry(self._read_logs, container, lines)
             
+            if log_file is not None:
+                return {
+                    "output": f"Last {lines} lines of container logs written to {log_file}",
+                    "log_file": str(log_file)
+                }
             return {
                 "output": f"Last {lines} lines of container logs:\n{logs}"
             }
             
         except docker.errors.NotFound:
+            self.container = None
             return {"output": "Container not found"}
         except Exception as e:
             logging.error(f"Error getting container logs: {e}")
             return {"output": f"ERROR: Failed to get logs: {str(e)}"}
     
+    @staticmethod
+    def _read_logs(container, lines: int):
+        """Stream the last lines of container logs; returns (text, None) or (None, file path).
+        
+        Chunks are kept in memory until they pass LOG_INLINE_LIMIT, after
+        which they are written to the next of LOG_FILES_KEPT files under
+        LOG_HOST_DIR.
+        """
+        chunks, size = [], 0
+        path = tmp_path = out = None
+        try:
+            for chunk in container.logs(tail=lines, timestamps=True, stream=True, follow=False):
+                if out is not None:
+                    out.write(chunk)
+                    continue
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > LOG_INLINE_LIMIT:
+                    LOG_HOST_DIR.mkdir(parents=True, exist_ok=True)
+                    slot = next(_LOG_FILE_SEQ) % LOG_FILES_KEPT
+                    path = LOG_HOST_DIR / f"container-{slot}.log"
+                    # Write then rename so a reader never sees a partial file
+                    tmp_path = path.with_suffix(".log.tmp")
+                    out = open(tmp_path, "wb")
+                    out.writelines(chunks)
+                    chunks = None
+        except BaseException:
+            if out is not None:
+                out.close()
+                tmp_path.unlink(missing_ok=True)
+            raise
+        if out is not None:
+            out.close()
+            tmp_path.replace(path)
+            return None, path
+        return b"".join(chunks).decode('utf-8', errors='replace'), None
+    
     async def _execute_in_container(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a Computer Use tool inside the container, at most EXEC_CONCURRENCY at a time."""
+        async with self._exec_sem:
+            return await self._run_tool_in_container(tool_name, arguments)
+    
+    async def _run_tool_in_container(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a Computer Use tool inside the container."""
         try:
-            if not self.docker_client:
+            if not await self._ensure_docker():
                 return {"output": "ERROR: Docker client not initialized"}
             
-            # Ensure container is running
-            status = await self._get_container_status()
-            if status.get("status") != "running":
+            # Ensure container is running; skipped while it is known to be
+            if not self._container_warm and not await self._is_container_running():
                 # Try to start container
                 start_result = await self._start_container()
                 if "ERROR" in start_result.get("output", ""):
                     return start_result
             
-            container = self.docker_client.containers.get(self.container_name)
+            # Once a request has been sent it is never retried, so a failed
+            # worker call cannot repeat an action; only a worker that cannot be
+            # started falls back to a one-off exec
+            try:
+                worker = await self._ensure_worker()
+            except Exception as e:
+                logging.warning(f"Container worker unavailable, using a one-off exec: {e}")
+                worker = None
+            if worker is not None:
+                result = await self._call_worker(worker, tool_name, arguments)
+                self._container_warm = True
+                return result
+            
+            container = await self._with_retry(self._get_container)
             
             # Prepare the command to execute in container
             cmd_data = {
@@ -408,69 +818,223 @@ class ContainerizedComputerUseMCP:
                 "arguments": arguments
             }
             
-            # Execute the command
-            exec_command = [
-                "python3", "-c",
-                f"""
-import json
-import sys
-from computer_use_container import ContainerizedComputerUseAPI
-
-api = ContainerizedComputerUseAPI()
-data = {json.dumps(cmd_data)}
-tool_name = data['tool']
-arguments = data['arguments']
-
-if tool_name == 'computer_20250124':
-    result = api.computer_20250124(**arguments)
-elif tool_name == 'text_editor_20250429':
-    result = api.text_editor_20250429(**arguments)
-elif tool_name == 'bash_20250124':
-    result = api.bash_20250124(**arguments)
-else:
-    result = {{'output': f'Unknown tool: {{tool_name}}'}}
-
-print(json.dumps(result))
-"""
-            ]
-            
-            result = container.exec_run(exec_command, stdout=True, stderr=True)
+            # Execute the command; the request goes in on stdin, so arguments
+            # never pass through source code or argv
+            exit_code, stdout, stderr = await self._with_retry(
+                self._exec_dispatch, container, _json_dumps(cmd_data) + b"\n",
+                idempotent=False
+            )
             
-            if result.exit_code != 0:
-                error_msg = result.output.decode('utf-8')
+            if exit_code != 0:
+                self._container_warm = False
+                error_msg = (stderr or stdout).decode('utf-8', errors='replace')
                 logging.error(f"Container execution error: {error_msg}")
                 return {"output": f"ERROR: Container execution failed: {error_msg}"}
+            self._container_warm = True
             
-            # Parse the result
-            output = result.output.decode('utf-8')
-            try:
-                return json.loads(output)
-            except json.JSONDecodeError:
-                # If not JSON, return as plain text
-                return {"output": output}
+            # Parse the result; dispatch.py always prints a JSON object, so
+            # anything else is returned as plain text without a parse attempt
+            if stdout.lstrip().startswith(b"{"):
+                try:
+                    return _json_loads(stdout)
+                except ValueError:
+                    pass
+            return {"output": stdout.decode('utf-8', errors='replace')}
                 
+        except docker.errors.NotFound:
+            self.container = None
+            self._container_warm = False
+            return {"output": "ERROR: Container not found"}
         except Exception as e:
+            self._container_warm = False
             logging.error(f"Error executing in container: {e}")
             return {"output": f"ERROR: Failed to execute in container: {str(e)}"}
     
+    def _exec_dispatch(self, container, request: bytes):
+        """Run DISPATCH_COMMAND once with request on stdin.
+        
+        Returns (exit code, stdout, stderr); the streams are demultiplexed so
+        log lines on stderr cannot corrupt the JSON result.
+        """
+        api = self.docker_client.api
+        exec_id = api.exec_create(
+            container.id, DISPATCH_COMMAND,
+            stdin=True, stdout=True, stderr=True, workdir="/app"
+        )["Id"]
+        sock = api.exec_start(exec_id, socket=True)
+        stdout, stderr = bytearray(), bytearray()
+        try:
+            getattr(sock, "_sock", sock).sendall(request)
+            for stream, data in docker_socket.frames_iter(sock, tty=False):
+                (stderr if stream == docker_socket.STDERR else stdout).extend(data)
+        finally:
+            sock.close()
+        return api.exec_inspect(exec_id)["ExitCode"], bytes(stdout), bytes(stderr)
+    
+    async def _call_worker(self, sock, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one tool call to the in-container worker and convert its reply."""
+        request_id = next(self._worker_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._worker_pending[request_id] = future
+        request = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "tools/call",
+            "params": {"name": tool_name, "arguments": arguments}
+        }
+        try:
+            await asyncio.to_thread(self._worker_send, sock, _json_dumps(request) + b"\n")
+            response = await asyncio.wait_for(future, WORKER_TIMEOUT)
+        finally:
+            self._worker_pending.pop(request_id, None)
+        
+        if "error" in response:
+            return {"output": f"ERROR: {response['error'].get('message', 'worker error')}"}
+        
+        # Map the worker's MCP content blocks back to a tool result
+        result = {"output": ""}
+        for block in response.get("result", {}).get("content", []):
+            if block.get("type") == "text":
+                result["output"] = block.get("text", "")
+            elif block.get("type") == "image":
+                result["screenshot"] = block["data"]
+                result["mime_type"] = block.get("mimeType", "image/png")
+            elif block.get("type") == "resource":
+                # Screenshot written to the shared mount; base64 only at the MCP boundary
+                resource = block["resource"]
+                data = await asyncio.to_thread(self._read_shared_file, resource["uri"])
+                result["screenshot"] = base64.b64encode(data).decode('ascii')
+                result["mime_type"] = resource.get("mimeType", "image/png")
+        return result
+    
+    @staticmethod
+    def _read_shared_file(uri: str) -> bytes:
+        """Read a file:// URI under the container's shared mount from the host side."""
+        relative = PurePosixPath(urlparse(uri).path).relative_to(SHARED_CONTAINER_DIR)
+        if ".." in relative.parts:
+            raise ValueError(f"Path escapes the shared directory: {uri}")
+        return SHARED_HOST_DIR.joinpath(*relative.parts).read_bytes()
+    
+    async def _ensure_worker(self):
+        """Return the worker's attach socket, starting the worker if needed."""
+        async with self._worker_lock:
+            if self._worker is None:
+                container = await self._with_retry(self._get_container)
+                sock = await self._with_retry(self._start_worker, container, idempotent=False)
+                threading.Thread(
+                    target=self._worker_read_loop,
+                    args=(sock, asyncio.get_running_loop()),
+                    name="container-worker-reader",
+                    daemon=True
+                ).start()
+                self._worker = sock
+            return self._worker
+    
+    def _start_worker(self, container):
+        """Exec the worker in the container and return its attached stdin/stdout socket."""
+        environment = {}
+        shared_mounted = any(
+            mount.get("Destination") == str(SHARED_CONTAINER_DIR)
+            for mount in container.attrs.get("Mounts", [])
+        )
+        if shared_mounted and SHARED_HOST_DIR.is_dir():
+            environment["SCREENSHOT_DIR"] = str(WORKER_SCREENSHOT_DIR)
+        
+        api = self.docker_client.api
+        exec_id = api.exec_create(
+            container.id, WORKER_COMMAND,
+            stdin=True, stdout=True, stderr=False, workdir="/app",
+            environment=environment or None
+        )["Id"]
+        logging.info("Started container worker")
+        return api.exec_start(exec_id, socket=True)
+    
+    def _worker_send(self, sock, data: bytes) -> None:
+        """Write to the worker's stdin; unix attach sockets wrap the raw socket."""
+        with self._worker_send_lock:
+            getattr(sock, "_sock", sock).sendall(data)
+    
+    def _worker_read_loop(self, sock, loop) -> None:
+        """Read multiplexed stdout frames from the worker and resolve waiting requests.
+        
+        Runs on its own thread for the life of the socket; responses may arrive
+        out of order, so each is matched to its request by id.
+        """
+        buf = bytearray()
+        try:
+            while True:
+                stream, size = docker_socket.next_frame_header(sock)
+                if size < 0:
+                    break
+                data = docker_socket.read_exactly(sock, size)
+                if stream != docker_socket.STDOUT:
+                    continue
+                buf += data
+                while (nl := buf.find(b"\n")) != -1:
+                    line = bytes(buf[:nl])
+                    del buf[:nl + 1]
+                    try:
+                        response = _json_loads(line)
+                    except ValueError:
+                        continue
+                    loop.call_soon_threadsafe(self._resolve_worker_request, response)
+        except Exception as e:
+            logging.warning(f"Container worker connection lost: {e}")
+        finally:
+            loop.call_soon_threadsafe(self._close_worker, sock)
+    
+    def _resolve_worker_request(self, response: Dict[str, Any]) -> None:
+        """Hand a worker response to the request waiting for it."""
+        future = self._worker_pending.get(response.get("id"))
+        if future is not None and not future.done():
+            future.set_result(response)
+    
+    def _close_worker(self, sock=None) -> None:
+        """Drop the worker connection (only if it is still sock, when given) and fail its waiters."""
+        if self._worker is None or (sock is not None and sock is not self._worker):
+            return
+        sock, self._worker = self._worker, None
+        self._container_warm = False
+        try:
+            # Shutting down first wakes the reader thread blocked on the socket
+            getattr(sock, "_sock", sock).shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        try:
+            sock.close()
+        except Exception:
+            pass
+        for future in self._worker_pending.values():
+            if not future.done():
+                future.set_exception(ConnectionResetError("Container worker exited"))
+    
     async def run(self):
         """Run the MCP server."""
         logging.info("Starting Containerized Computer Use MCP Server...")
         
-        # Check Docker availability
-        if self.docker_client:
-            logging.info("Docker client connected successfully")
-            status = await self._get_container_status()
-            logging.info(f"Initial container status: {status.get('status', 'unknown')}")
-        else:
-            logging.warning("Docker client not available - container management disabled")
-        
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options()
-            )
+        # Docker is connected on the first container request, so the MCP
+        # handshake does not wait on it
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options()
+                )
+        finally:
+            await self.close()
+    
+    async def close(self):
+        """Release the background connections to Docker and the client's connection pool."""
+        self._stop_stats_stream()
+        self._close_worker()
+        client, self.docker_client = self.docker_client, None
+        self.container = None
+        if client is not None:
+            try:
+                await asyncio.to_thread(client.close)
+            except Exception as e:
+                logging.warning(f"Error closing Docker client: {e}")
 
 
 async def main():
@@ -5,53 +5,215 @@ Demonstrates various capabilities with visual feedback
 """
 
 import json
+import queue
 import subprocess
+import threading
 import time
-import base64
+import binascii
 import sys
-from typing import Dict, Any
+import itertools
+import shutil
+from collections import deque
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+# The in-container MCP server; it reads one JSON-RPC request per line on
+# stdin and answers on stdout, so one exec session serves the whole demo
+WORKER_COMMAND = ["python3", "-u", "/app/container_mcp_wrapper.py"]
+
+# Seconds to wait for a response before giving up on a request
+REQUEST_TIMEOUT = 30
+
+# Shared bind mount (see docker-compose.yml); when it is in place the worker
+# writes screenshots there and save_screenshot copies the file, skipping the
+# base64 round trip through the pipe
+SHARED_HOST_DIR = Path(__file__).parent / "shared"
+SHARED_CONTAINER_DIR = PurePosixPath("/app/shared")
+WORKER_SCREENSHOT_DIR = SHARED_CONTAINER_DIR / "screenshots"
+
+# Section header rule, built once
+HEADER_BAR = "=" * 60
+
+# Contents of the file written by demo_file_operations; {timestamp} is filled in
+DEMO_FILE_TEMPLATE = """# Container Demo File
+This file was created inside the containerized Computer Use server.
+
+Current time: {timestamp}
+Container environment: Ubuntu with X11 display
+
+## Features Demonstrated:
+- File creation
+- Content editing
+- File reading
+"""
+
+# Script written and run by demo_advanced_features
+PLOT_SCRIPT = '''#!/usr/bin/env python3
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Generate data
+x = np.linspace(0, 2 * np.pi, 100)
+y = np.sin(x)
+
+# Create plot
+plt.figure(figsize=(10, 6))
+plt.plot(x, y, 'b-', linewidth=2)
+plt.title('Sine Wave Generated in Container')
+plt.xlabel('X')
+plt.ylabel('sin(X)')
+plt.grid(True)
+plt.savefig('/workspace/sine_wave.png')
+print("Plot saved to /workspace/sine_wave.png")
+'''
+
+# File extension for each screenshot MIME type
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
 
 class ContainerDemo:
     """Interactive demonstration of containerized Computer Use capabilities."""
     
     def __init__(self):
         self.container_name = "windows-computer-use"
-        
-    def run_mcp_command(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute an MCP command in the container."""
-        request = {
+        # Persistent worker process, started on the first command
+        self.proc = None
+        self._ids = itertools.count(1)
+        self._responses = queue.Queue()
+        self._stderr_tail = deque(maxlen=20)
+    
+    def _ensure_worker(self) -> subprocess.Popen:
+        """Start the in-container MCP server unless it is already running."""
+        if self.proc is not None and self.proc.poll() is None:
+            return self.proc
+        env = []
+        if self._shared_mounted():
+            env = ["-e", f"SCREENSHOT_DIR={WORKER_SCREENSHOT_DIR}"]
+        self.proc = subprocess.Popen(
+            ["docker", "exec", "-i"] + env + [self.container_name] + WORKER_COMMAND,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self._responses = queue.Queue()
+        self._stderr_tail.clear()
+        # Binary pipes: responses go to json.loads as bytes without a decode
+        # pass. Readers in threads: select() does not work on pipes on Windows
+        threading.Thread(target=self._read_responses, args=(self.proc, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.proc,), daemon=True).start()
+        return self.proc
+    
+    def _shared_mounted(self) -> bool:
+        """Whether the local shared directory is mounted at SHARED_CONTAINER_DIR."""
+        if not SHARED_HOST_DIR.is_dir():
+            return False
+        cmd = ["docker", "inspect", "--format", "{{json .Mounts}}", self.container_name]
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+            mounts = json.loads(result.stdout) if result.returncode == 0 else []
+        except Exception:
+            return False
+        return any(mount.get("Destination") == str(SHARED_CONTAINER_DIR) for mount in mounts or [])
+    
+    @staticmethod
+    def _read_responses(proc: subprocess.Popen, responses: queue.Queue):
+        """Queue each stdout line of the worker; None marks its exit."""
+        for line in proc.stdout:
+            responses.put(line)
+        responses.put(None)
+    
+    def _read_stderr(self, proc: subprocess.Popen):
+        """Keep the last worker log lines for error messages."""
+        for line in proc.stderr:
+            self._stderr_tail.append(line.decode('utf-8', errors='replace').rstrip())
+    
+    def _request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build a JSON-RPC request with a fresh id."""
+        return {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": next(self._ids),
             "method": method,
             "params": params or {}
         }
-        
-        # Execute command in container
-        cmd = [
-            "docker", "exec", "-i", self.container_name,
-            "python3", "-c",
-            f"import sys, json; from container_mcp_wrapper import ContainerMCPServer; "
-            f"import asyncio; server = ContainerMCPServer(); "
-            f"result = asyncio.run(server.handle_request({json.dumps(request)})); "
-            f"print(json.dumps(result))"
-        ]
-        
+    
+    def _exchange(self, payload, request_id: int):
+        """Send one request or batch line and return the reply whose (first) id is request_id."""
+        proc = self._ensure_worker()
+        proc.stdin.write(json.dumps(payload).encode() + b"\n")
+        proc.stdin.flush()
+        
+        # Responses to earlier, timed-out requests may still arrive first
+        deadline = time.monotonic() + REQUEST_TIMEOUT
+        while True:
+            try:
+                line = self._responses.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"no response within {REQUEST_TIMEOUT}s")
+            if line is None:
+                self.proc = None
+                log = "\n".join(self._stderr_tail)
+                raise RuntimeError(f"Command failed: {log}")
+            reply = json.loads(line)
+            first = reply[0] if isinstance(reply, list) and reply else reply
+            if isinstance(first, dict) and first.get("id") == request_id:
+                return reply
+    
+    def run_mcp_command(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Execute an MCP command in the container."""
+        request = self._request(method, params)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-            else:
-                return {"error": f"Command failed: {result.stderr}"}
+            return self._exchange(request, request["id"])
+        except RuntimeError as e:
+            return {"error": str(e)}
         except Exception as e:
             return {"error": f"Execution error: {str(e)}"}
     
+    def run_mcp_batch(self, commands: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Execute (method, params) commands in order as one JSON-RPC batch.
+        
+        Returns one response per command, in the order given.
+        """
+        batch = [self._request(method, params) for method, params in commands]
+        if not batch:
+            return []
+        try:
+            replies = self._exchange(batch, batch[0]["id"])
+        except RuntimeError as e:
+            return [{"error": str(e)}] * len(batch)
+        except Exception as e:
+            return [{"error": f"Execution error: {str(e)}"}] * len(batch)
+        by_id = {reply.get("id"): reply for reply in replies}
+        return [by_id.get(request["id"], {"error": "No response"}) for request in batch]
+    
+    def close(self):
+        """Stop the in-container worker."""
+        proc, self.proc = self.proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.terminate()
+    
+    @staticmethod
+    def _result_content(response: Dict[str, Any]):
+        """Content items of a tools/call response; empty on an error response."""
+        result = response.get("result")
+        return result.get("content", ()) if result else ()
+    
+    def _extract_text(self, response: Dict[str, Any]) -> Optional[str]:
+        """Text of the first content item, or None if it is not text."""
+        content = self._result_content(response)
+        if content and content[0].get("type") == "text":
+            return content[0].get("text", "")
+        return None
+    
     def print_header(self, title: str):
         """Print a formatted header."""
-        print(f"\n{'='*60}")
-        print(f"{title:^60}")
-        print(f"{'='*60}\n")
+        print(f"\n{HEADER_BAR}\n{title:^60}\n{HEADER_BAR}\n")
     
     def save_screenshot(self, name: str):
         """Take and save a screenshot."""
@@ -60,22 +222,39 @@ class ContainerDemo:
             "arguments": {"action": "screenshot"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            for item in content:
-                if item.get("type") == "image":
-                    screenshot_data = item.get("data", "")
-                    if screenshot_data:
-                        # Save to file
-                        filename = f"screenshot_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                        with open(filename, "wb") as f:
-                            f.write(base64.b64decode(screenshot_data))
-                        print(f"✓ Screenshot saved: {filename}")
-                        return True
+        for item in self._result_content(response):
+            if item.get("type") == "image":
+                screenshot_data = item.get("data", "")
+                if screenshot_data:
+                    # Save to file; a2b_base64 decodes the ASCII str directly
+                    filename = self._screenshot_filename(name, item.get("mimeType"))
+                    with open(filename, "wb") as f:
+                        f.write(binascii.a2b_base64(screenshot_data))
+                    print(f"✓ Screenshot saved: {filename}")
+                    return True
+            elif item.get("type") == "resource":
+                # Written to the shared mount by the worker; copy it as-is
+                resource = item.get("resource", {})
+                filename = self._screenshot_filename(name, resource.get("mimeType"))
+                try:
+                    relative = PurePosixPath(urlparse(resource.get("uri", "")).path).relative_to(SHARED_CONTAINER_DIR)
+                    if ".." in relative.parts:
+                        raise ValueError("path escapes the shared directory")
+                    shutil.copyfile(SHARED_HOST_DIR.joinpath(*relative.parts), filename)
+                except (ValueError, OSError):
+                    break
+                print(f"✓ Screenshot saved: {filename}")
+                return True
         
         print("✗ Failed to capture screenshot")
         return False
     
+    @staticmethod
+    def _screenshot_filename(name: str, mime_type: str = None) -> str:
+        """Local file name for a screenshot of the given type."""
+        ext = IMAGE_EXTENSIONS.get(mime_type, ".png")
+        return f"screenshot_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+    
     def demo_system_info(self):
         """Demonstrate system information gathering."""
         self.print_header("System Information Demo")
@@ -88,10 +267,9 @@ class ContainerDemo:
             "arguments": {"command": "uname -a && echo && lsb_release -a 2>/dev/null && echo && df -h / && echo && free -h"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print(content[0].get("text", ""))
+        text = self._extract_text(response)
+        if text is not None:
+            print(text)
         
         # Check installed packages
         print("\nChecking key installed packages...")
@@ -100,27 +278,16 @@ class ContainerDemo:
             "arguments": {"command": "python3 --version && echo && pip list | grep -E 'pyautogui|pillow|fastmcp'"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print(content[0].get("text", ""))
+        text = self._extract_text(response)
+        if text is not None:
+            print(text)
     
     def demo_file_operations(self):
         """Demonstrate file operations."""
         self.print_header("File Operations Demo")
         
         # Create a demo file
-        demo_content = """# Container Demo File
-This file was created inside the containerized Computer Use server.
-
-Current time: {}
-Container environment: Ubuntu with X11 display
-
-## Features Demonstrated:
-- File creation
-- Content editing
-- File reading
-""".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        demo_content = DEMO_FILE_TEMPLATE.format(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         
         file_path = "/workspace/demo_file.md"
         
@@ -147,13 +314,12 @@ Container environment: Ubuntu with X11 display
             }
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print("\nFile contents:")
-                print("-" * 40)
-                print(content[0].get("text", ""))
-                print("-" * 40)
+        text = self._extract_text(response)
+        if text is not None:
+            print("\nFile contents:")
+            print("-" * 40)
+            print(text)
+            print("-" * 40)
         
         # List workspace files
         print("\nListing workspace files...")
@@ -162,10 +328,9 @@ Container environment: Ubuntu with X11 display
             "arguments": {"command": "ls -la /workspace/"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print(content[0].get("text", ""))
+        text = self._extract_text(response)
+        if text is not None:
+            print(text)
     
     def demo_gui_automation(self):
         """Demonstrate GUI automation capabilities."""
@@ -224,18 +389,31 @@ Container environment: Ubuntu with X11 display
         
         # Move mouse in a pattern
         print("\n1. Moving mouse in a square pattern...")
+        # Coordinates are screen pixels: no scale is sent, so they are not
+        # affected by the downscaled screenshots taken earlier
         positions = [(400, 300), (600, 300), (600, 500), (400, 500), (400, 300)]
         
-        for i, (x, y) in enumerate(positions):
-            print(f"   Moving to ({x}, {y})")
-            response = self.run_mcp_command("tools/call", {
+        # One round trip for the whole pattern; the moves run in order
+        print("   Moving to " + " -> ".join(f"({x}, {y})" for x, y in positions))
+        responses = self.run_mcp_batch([
+            ("tools/call", {
                 "name": "computer_20250124",
                 "arguments": {
                     "action": "mouse_move",
                     "coordinate": [x, y]
                 }
             })
-            time.sleep(0.5)
+            for x, y in positions
+        ])
+        for (x, y), response in zip(positions, responses):
+            error = response.get("error")
+            if isinstance(error, dict):
+                error = error.get("message", error)
+            text = self._extract_text(response)
+            if error is None and text and text.startswith("ERROR"):
+                error = text
+            if error:
+                print(f"   ✗ Move to ({x}, {y}) failed: {error}")
         
         # Demonstrate click
         print("\n2. Clicking at center of screen...")
@@ -267,33 +445,14 @@ Container environment: Ubuntu with X11 display
         
         print("Demonstrating advanced capabilities...")
         
-        # Create a Python script in the container
-        script_content = '''#!/usr/bin/env python3
-import matplotlib.pyplot as plt
-import numpy as np
-
-# Generate data
-x = np.linspace(0, 2 * np.pi, 100)
-y = np.sin(x)
-
-# Create plot
-plt.figure(figsize=(10, 6))
-plt.plot(x, y, 'b-', linewidth=2)
-plt.title('Sine Wave Generated in Container')
-plt.xlabel('X')
-plt.ylabel('sin(X)')
-plt.grid(True)
-plt.savefig('/workspace/sine_wave.png')
-print("Plot saved to /workspace/sine_wave.png")
-'''
-        
+        # Create a Python script in the container (PLOT_SCRIPT)
         print("\n1. Creating Python visualization script...")
         response = self.run_mcp_command("tools/call", {
             "name": "text_editor_20250429",
             "arguments": {
                 "command": "create",
                 "path": "/workspace/plot_demo.py",
-                "file_text": script_content
+                "file_text": PLOT_SCRIPT
             }
         })
         
@@ -309,10 +468,9 @@ print("Plot saved to /workspace/sine_wave.png")
             "arguments": {"command": "cd /workspace && python3 plot_demo.py"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print(content[0].get("text", ""))
+        text = self._extract_text(response)
+        if text is not None:
+            print(text)
         
         # Check if file was created
         print("\n4. Verifying output...")
@@ -321,10 +479,9 @@ print("Plot saved to /workspace/sine_wave.png")
             "arguments": {"command": "ls -la /workspace/*.png"}
         })
         
-        if "result" in response and "content" in response.get("result", {}):
-            content = response["result"]["content"]
-            if content and content[0].get("type") == "text":
-                print(content[0].get("text", ""))
+        text = self._extract_text(response)
+        if text is not None:
+            print(text)
         
         print("\n✓ Advanced features demo completed")
     
@@ -363,7 +520,7 @@ print("Plot saved to /workspace/sine_wave.png")
         self.print_header("Demo Complete!")
         print("All demonstrations have been completed.")
         print("\nCheck the following outputs:")
-        print("- Screenshots: screenshot_*.png files")
+        print("- Screenshots: screenshot_* image files")
         print("- Workspace files: Available in container at /workspace/")
         print("- Container logs: docker logs windows-computer-use")
 
@@ -388,6 +545,8 @@ def main():
     except Exception as e:
         print(f"\n\nDemo failed with error: {e}")
         sys.exit(1)
+    finally:
+        demo.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+One-shot tool dispatcher for the containerized Computer Use API.
+Reads one JSON request line ({"tool": ..., "arguments": {...}}) from stdin and
+prints the tool result as JSON. Used when the persistent worker is unavailable.
+"""
+
+import sys
+import json
+from computer_use_container import ContainerizedComputerUseAPI
+
+TOOLS = ("computer_20250124", "text_editor_20250429", "bash_20250124")
+
+
+def main():
+    """Run a single tool call."""
+    request = json.loads(sys.stdin.readline())
+    tool_name = request["tool"]
+    if tool_name in TOOLS:
+        api = ContainerizedComputerUseAPI()
+        result = getattr(api, tool_name)(**request["arguments"])
+    else:
+        result = {"output": f"Unknown tool: {tool_name}"}
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,94 @@ import json
 import time
 import sys
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+# Runs inside the container for the whole session and answers one JSON line
+# per input line: "fs" gives the root filesystem usage (instead of a
+# `docker exec df`), "procs" the first processes as [pid, rss, command] read
+# from /proc (instead of `docker top`)
+PROBE_SCRIPT = """
+import json, os, sys
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+def fs():
+    st = os.statvfs("/")
+    return {
+        "size": st.f_blocks * st.f_frsize,
+        "used": (st.f_blocks - st.f_bfree) * st.f_frsize,
+        "available": st.f_bavail * st.f_frsize,
+    }
+def procs(limit):
+    rows = []
+    for pid in sorted((int(p) for p in os.listdir("/proc") if p.isdigit())):
+        if pid == os.getpid():
+            continue
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                rss = int(f.read().split()[1]) * PAGE_SIZE
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmd = f.read().replace(b"\\0", b" ").decode(errors="replace").strip()
+            if not cmd:
+                with open(f"/proc/{pid}/comm") as f:
+                    cmd = "[" + f.read().strip() + "]"
+        except OSError:
+            continue
+        rows.append([pid, rss, cmd])
+        if len(rows) == limit:
+            break
+    return rows
+for line in sys.stdin:
+    print(json.dumps(procs(9) if line.strip() == "procs" else fs()), flush=True)
+"""
+
+# Dashboard text that does not change between refreshes, built once at import;
+# the templates are filled with str.format_map
+RULE = "=" * 80
+PROCESS_RULE = "-" * 80
+
+
+def section_header(title: str) -> str:
+    """Blank line, then the title between two rules."""
+    return f"\n{'='*40} {title} {'='*40}"
+
+
+HEADER_TEMPLATE = "\n".join([
+    RULE,
+    f"{'Containerized Computer Use Monitor':^80}",
+    "{timestamp:^80}",
+    RULE,
+])
+INFO_TEMPLATE = "\n".join([
+    f"\n{'Container Status:':<20} {{status}}",
+    f"{'Container ID:':<20} {{id}}",
+    f"{'Created:':<20} {{created}}",
+    f"{'Restart Count:':<20} {{restart_count}}",
+])
+RESOURCE_TEMPLATE = "\n".join([
+    section_header("Resource Usage"),
+    f"{'CPU Usage:':<20} {{CPUPerc}}",
+    f"{'Memory Usage:':<20} {{MemUsage}} ({{MemPerc}})",
+    f"{'Network I/O:':<20} {{NetIO}}",
+    f"{'Block I/O:':<20} {{BlockIO}}",
+])
+FILESYSTEM_TEMPLATE = "\n".join([
+    section_header("Filesystem Usage"),
+    f"{'Total Size:':<20} {{size}}",
+    f"{'Used:':<20} {{used}} ({{percent}})",
+    f"{'Available:':<20} {{available}}",
+])
+SERVICE_HEADER = section_header("Service Status")
+PROCESSES_HEADER = section_header("Running Processes")
+LOGS_HEADER = section_header("Recent Logs")
+FOOTER_TEMPLATE = "\n" + RULE + "\n{footer:^80}"
+
+# Seconds a `docker inspect` result is reused; Id, Created and the port
+# mappings only change when the container is recreated
+INFO_CACHE_TTL = 30
+
 
 class ContainerMonitor:
     """Monitor containerized Computer Use server."""
@@ -19,95 +104,214 @@ class ContainerMonitor:
     def __init__(self):
         self.container_name = "windows-computer-use"
         self.refresh_interval = 2  # seconds
+        # Longest a refresh waits on a docker command, so a hung daemon
+        # cannot freeze the dashboard
+        self.probe_timeout = max(1, self.refresh_interval - 0.5)
         self.log_lines = 10
+        # Last inspect result and when it was fetched, see INFO_CACHE_TTL
+        self._info_cache = None
+        self._info_ts = 0.0
+        
+        # Fed by long-running `docker stats` / `docker logs -f` readers, see
+        # start_streams(); one subprocess each instead of one per refresh
+        self._stats = {}
+        self._stats_ready = threading.Event()
+        self._logs = deque(maxlen=self.log_lines)
+        self._stop = threading.Event()
+        self._procs = []
+        
+        self._ansi_enabled = False
+        
+        # Persistent in-container probe, see PROBE_SCRIPT; the lock keeps
+        # the filesystem and process requests from interleaving on its pipe
+        self._probe = None
+        self._probe_lock = threading.Lock()
         
+        # Runs the per-refresh docker commands (inspect, exec df, top) side by side
+        self.pool = ThreadPoolExecutor(max_workers=3)
+        # Probes still running after their refresh gave up on them, by name;
+        # they are waited on again instead of being started a second time
+        self._pending_probes = {}
+        
+    def _clear_sequence(self) -> str:
+        """ANSI escapes that clear the screen: cursor home, then erase to the end."""
+        if not self._ansi_enabled:
+            if os.name == 'nt':
+                os.system('')  # Turns on escape sequence handling in the Windows console
+            self._ansi_enabled = True
+        return "\x1b[H\x1b[J"
+    
     def clear_screen(self):
-        """Clear the terminal screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Clear the terminal screen with ANSI escapes instead of a clear/cls process."""
+        sys.stdout.write(self._clear_sequence())
+        sys.stdout.flush()
     
-    def get_container_stats(self) -> Dict[str, any]:
-        """Get container resource statistics."""
-        cmd = ["docker", "stats", self.container_name, "--no-stream", "--format", "json"]
+    def start_streams(self):
+        """Start the background stats and log readers."""
+        threading.Thread(
+            target=self._pump,
+            args=(["docker", "stats", self.container_name, "--format", "{{json .}}"], self._on_stats_line),
+            daemon=True
+        ).start()
+        threading.Thread(
+            target=self._pump,
+            args=(["docker", "logs", "-f", "--tail", str(self.log_lines), self.container_name], self._on_log_line),
+            kwargs={"on_start": self._logs.clear},
+            daemon=True
+        ).start()
+    
+    def _pump(self, cmd: List[str], on_line, on_start=None):
+        """Feed each output line of cmd to on_line, restarting it if it exits (e.g. on container stop)."""
+        while not self._stop.is_set():
+            try:
+                proc = subprocess.Popen(
+                    cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    text=True, encoding="utf-8", errors="replace"
+                )
+            except OSError:
+                return
+            self._procs.append(proc)
+            if on_start:
+                on_start()
+            for line in proc.stdout:
+                on_line(line.rstrip('\n'))
+            proc.wait()
+            self._procs.remove(proc)
+            self._stop.wait(self.refresh_interval)
+    
+    def _on_stats_line(self, line: str):
+        """Keep the newest stats sample; streamed lines may carry screen-control escapes."""
+        start, end = line.find('{'), line.rfind('}')
+        if start == -1 or end < start:
+            return
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout:
-                return json.loads(result.stdout)
-        except:
-            pass
-        return {}
+            self._stats = json.loads(line[start:end + 1])
+        except ValueError:
+            return
+        self._stats_ready.set()
+    
+    def _on_log_line(self, line: str):
+        """Keep a log line; blank lines are dropped here rather than on every refresh."""
+        if line.strip():
+            self._logs.append(line)
     
-    def get_container_info(self) -> Dict[str, any]:
-        """Get container information."""
+    def close(self):
+        """Stop the background readers."""
+        self._stop.set()
+        for proc in list(self._procs):
+            proc.terminate()
+        if self._probe is not None:
+            self._probe.terminate()
+        self.pool.shutdown(wait=False)
+    
+    def get_container_stats(self) -> Dict[str, any]:
+        """Get container resource statistics (latest streamed sample)."""
+        return self._stats
+    
+    def get_container_info(self, refresh: bool = False) -> Dict[str, any]:
+        """Get container information, reusing an inspect younger than INFO_CACHE_TTL."""
+        if not refresh and self._info_cache and time.monotonic() - self._info_ts < INFO_CACHE_TTL:
+            return self._info_cache
+        
         cmd = ["docker", "inspect", self.container_name]
+        info = {}
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Bytes go straight to json.loads, without a separate decode pass
+            result = subprocess.run(cmd, capture_output=True, timeout=self.probe_timeout)
             if result.returncode == 0:
                 data = json.loads(result.stdout)
                 if data:
-                    return data[0]
+                    info = data[0]
         except:
             pass
-        return {}
+        self._info_cache = info
+        self._info_ts = time.monotonic()
+        return info
+    
+    def _state_changed(self, stats: Dict[str, any]) -> bool:
+        """Whether stats contradict the cached running state (a stopped container reports 0 PIDs)."""
+        if not self._info_cache:
+            return False
+        running = bool(stats) and stats.get('PIDs', '0') != '0'
+        return running != bool(self._info_cache.get('State', {}).get('Running'))
+    
+    def _probe_request(self, op: str):
+        """Send op to the in-container probe, starting it if needed; returns its decoded answer or None."""
+        with self._probe_lock:
+            if self._probe is None or self._probe.poll() is not None:
+                self._probe = subprocess.Popen(
+                    ["docker", "exec", "-i", self.container_name, "python3", "-u", "-c", PROBE_SCRIPT],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, bufsize=1
+                )
+            self._probe.stdin.write(op + "\n")
+            self._probe.stdin.flush()
+            line = self._probe.stdout.readline()
+        return json.loads(line) if line else None
     
     def get_container_processes(self) -> List[str]:
-        """Get running processes in container."""
-        cmd = ["docker", "top", self.container_name]
+        """Get running processes in container (a header line, then PID, RSS and command)."""
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                return lines[:10]  # First 10 processes
+            rows = self._probe_request("procs")
+            if rows:
+                lines = [f"{'PID':>7} {'RSS':>6}  COMMAND"]
+                for pid, rss, cmd in rows:
+                    lines.append(f"{pid:>7} {self.format_size(rss):>6}  {cmd[:64]}")
+                return lines
         except:
             pass
         return []
     
     def get_container_logs(self) -> List[str]:
-        """Get recent container logs."""
-        cmd = ["docker", "logs", self.container_name, "--tail", str(self.log_lines)]
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stderr.strip().split('\n')[-self.log_lines:]
-        except:
-            pass
-        return []
+        """Get recent container logs (stdout and stderr, as streamed)."""
+        return list(self._logs)
     
-    def get_port_status(self) -> Dict[str, bool]:
-        """Check if ports are accessible."""
+    def get_port_status(self, info: Dict[str, any] = None) -> Dict[str, bool]:
+        """Check if ports are accessible, from info or the (cached) inspect result."""
         ports = {
             "5900": "VNC Server",
             "8080": "MCP Server"
         }
         
+        # Simple check if port is mapped
+        if info is None:
+            info = self.get_container_info()
+        mapped = (info.get('NetworkSettings') or {}).get('Ports') or {}
         status = {}
         for port, service in ports.items():
-            # Simple check if port is mapped
-            cmd = ["docker", "port", self.container_name, port]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            status[service] = result.returncode == 0 and bool(result.stdout)
+            status[service] = bool(mapped.get(f"{port}/tcp"))
         
         return status
     
     def get_filesystem_usage(self) -> Dict[str, str]:
         """Get filesystem usage in container."""
-        cmd = ["docker", "exec", self.container_name, "df", "-h", "/"]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                if len(lines) > 1:
-                    parts = lines[1].split()
-                    if len(parts) >= 5:
-                        return {
-                            "size": parts[1],
-                            "used": parts[2],
-                            "available": parts[3],
-                            "percent": parts[4]
-                        }
+            usage = self._probe_request("fs")
+            if usage:
+                used, available = usage["used"], usage["available"]
+                # Rounded up like df: share of the space usable by non-root
+                percent = -(-used * 100 // (used + available)) if used + available else 0
+                return {
+                    "size": self.format_size(usage["size"]),
+                    "used": self.format_size(used),
+                    "available": self.format_size(available),
+                    "percent": f"{percent}%"
+                }
         except:
             pass
         return {}
     
+    @staticmethod
+    def format_size(size: int) -> str:
+        """Format a byte count like df -h (e.g. 9.8G)."""
+        for unit in ("B", "K", "M", "G", "T"):
+            if size < 1024 or unit == "T":
+                break
+            size /= 1024
+        if unit == "B":
+            return f"{size}B"
+        return f"{size:.1f}{unit}" if size < 10 else f"{size:.0f}{unit}"
+    
     def format_bytes(self, bytes_str: str) -> str:
         """Format byte string for display."""
         # Remove 'iB' suffix if present
@@ -115,73 +319,102 @@ class ContainerMonitor:
             return bytes_str[:-2] + 'B'
         return bytes_str
     
+    def _run_probes(self, probes) -> list:
+        """Run (name, default, fn, *args) probes side by side, waiting at most probe_timeout.
+        
+        A probe that is not done in time shows its default; it keeps running
+        and its result is picked up by a later refresh.
+        """
+        futures = []
+        for name, default, fn, *args in probes:
+            future = self._pending_probes.pop(name, None) or self.pool.submit(fn, *args)
+            futures.append((name, default, future))
+        
+        deadline = time.monotonic() + self.probe_timeout
+        results = []
+        for name, default, future in futures:
+            try:
+                results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                self._pending_probes[name] = future
+                results.append(default)
+            except Exception:
+                results.append(default)
+        return results
+    
     def display_dashboard(self):
         """Display the monitoring dashboard."""
-        self.clear_screen()
+        # The probes that run a docker command go out together; the inspect is
+        # repeated early when the stats show a start or stop
+        stats = self.get_container_stats()
+        info, fs_usage, processes = self._run_probes([
+            ("info", {}, self.get_container_info, self._state_changed(stats)),
+            ("fs_usage", {}, self.get_filesystem_usage),
+            ("processes", [], self.get_container_processes),
+        ])
+        port_status = self.get_port_status(info)
+        logs = self.get_container_logs()
+        
+        # The frame is collected here and written in one go
+        lines = []
         
         # Header
-        print("="*80)
-        print(f"{'Containerized Computer Use Monitor':^80}")
-        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S'):^80}")
-        print("="*80)
+        lines.append(HEADER_TEMPLATE.format_map({"timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')}))
         
         # Container Info
-        info = self.get_container_info()
         if info:
             state = info.get('State', {})
-            print(f"\n{'Container Status:':<20} {'RUNNING' if state.get('Running') else 'STOPPED'}")
-            print(f"{'Container ID:':<20} {info.get('Id', '')[:12]}")
-            print(f"{'Created:':<20} {info.get('Created', '')[:19]}")
-            print(f"{'Restart Count:':<20} {info.get('RestartCount', 0)}")
+            lines.append(INFO_TEMPLATE.format_map({
+                "status": 'RUNNING' if state.get('Running') else 'STOPPED',
+                "id": info.get('Id', '')[:12],
+                "created": info.get('Created', '')[:19],
+                "restart_count": info.get('RestartCount', 0)
+            }))
         
         # Resource Usage
-        stats = self.get_container_stats()
         if stats:
-            print(f"\n{'='*40} Resource Usage {'='*40}")
-            print(f"{'CPU Usage:':<20} {stats.get('CPUPerc', 'N/A')}")
-            print(f"{'Memory Usage:':<20} {stats.get('MemUsage', 'N/A')} ({stats.get('MemPerc', 'N/A')})")
-            print(f"{'Network I/O:':<20} {stats.get('NetIO', 'N/A')}")
-            print(f"{'Block I/O:':<20} {stats.get('BlockIO', 'N/A')}")
+            lines.append(RESOURCE_TEMPLATE.format_map({
+                key: stats.get(key, 'N/A') for key in ('CPUPerc', 'MemUsage', 'MemPerc', 'NetIO', 'BlockIO')
+            }))
         
         # Filesystem Usage
-        fs_usage = self.get_filesystem_usage()
         if fs_usage:
-            print(f"\n{'='*40} Filesystem Usage {'='*40}")
-            print(f"{'Total Size:':<20} {fs_usage.get('size', 'N/A')}")
-            print(f"{'Used:':<20} {fs_usage.get('used', 'N/A')} ({fs_usage.get('percent', 'N/A')})")
-            print(f"{'Available:':<20} {fs_usage.get('available', 'N/A')}")
+            lines.append(FILESYSTEM_TEMPLATE.format_map({
+                key: fs_usage.get(key, 'N/A') for key in ('size', 'used', 'percent', 'available')
+            }))
         
         # Port Status
-        port_status = self.get_port_status()
-        print(f"\n{'='*40} Service Status {'='*40}")
+        lines.append(SERVICE_HEADER)
         for service, available in port_status.items():
             status = "✓ Available" if available else "✗ Not Available"
-            print(f"{service:<20} {status}")
+            lines.append(f"{service:<20} {status}")
         
         # Running Processes
-        processes = self.get_container_processes()
         if processes:
-            print(f"\n{'='*40} Running Processes {'='*40}")
+            lines.append(PROCESSES_HEADER)
             for i, process in enumerate(processes[:5]):
                 if i == 0:  # Header
-                    print(f"{process}")
-                    print("-"*80)
+                    lines.append(process)
+                    lines.append(PROCESS_RULE)
                 else:
-                    print(f"{process}")
+                    lines.append(process)
         
         # Recent Logs
-        logs = self.get_container_logs()
         if logs:
-            print(f"\n{'='*40} Recent Logs {'='*40}")
+            lines.append(LOGS_HEADER)
             for log in logs[-5:]:
-                if log.strip():
-                    # Truncate long lines
-                    display_log = log[:100] + "..." if len(log) > 100 else log
-                    print(f"{display_log}")
+                # Truncate long lines
+                display_log = log[:100] + "..." if len(log) > 100 else log
+                lines.append(display_log)
         
         # Footer
-        print("\n" + "="*80)
-        print(f"{'Press Ctrl+C to exit | Refreshing every ' + str(self.refresh_interval) + 's':^80}")
+        lines.append(FOOTER_TEMPLATE.format_map({
+            "footer": f"Press Ctrl+C to exit | Refreshing every {self.refresh_interval}s"
+        }))
+        
+        # Cleared only once everything is in, so the screen does not sit blank
+        sys.stdout.write(self._clear_sequence() + "\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     def run(self):
         """Run the monitoring dashboard."""
@@ -198,6 +431,8 @@ class ContainerMonitor:
             sys.exit(1)
         
         try:
+            self.start_streams()
+            self._stats_ready.wait(self.refresh_interval)
             while True:
                 self.display_dashboard()
                 time.sleep(self.refresh_interval)
@@ -206,6 +441,8 @@ class ContainerMonitor:
         except Exception as e:
             print(f"\n\nError: {e}")
             sys.exit(1)
+        finally:
+            self.close()
 
 
 def main():
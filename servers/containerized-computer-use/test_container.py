@@ -11,6 +11,14 @@ import base64
 from typing import Dict, Any, List
 import sys
 
+# Handles one JSON-RPC request read from stdin; the request is never part of
+# the source, so any JSON (true/false/null, quotes, large payloads) passes as-is
+CALL_SCRIPT = (
+    "import sys, json, asyncio; from container_mcp_wrapper import ContainerMCPServer; "
+    "request = json.load(sys.stdin); "
+    "print(json.dumps(asyncio.run(ContainerMCPServer().handle_request(request))))"
+)
+
 
 class ContainerTester:
     """Test harness for containerized Computer Use server."""
@@ -29,21 +37,16 @@ class ContainerTester:
         }
         
         # Execute command in container
-        cmd = [
-            "docker", "exec", "-i", self.container_name,
-            "python3", "-c",
-            f"import sys, json; from container_mcp_wrapper import ContainerMCPServer; "
-            f"import asyncio; server = ContainerMCPServer(); "
-            f"result = asyncio.run(server.handle_request({json.dumps(request)})); "
-            f"print(json.dumps(result))"
-        ]
+        cmd = ["docker", "exec", "-i", self.container_name, "python3", "-c", CALL_SCRIPT]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            result = subprocess.run(
+                cmd, input=json.dumps(request).encode(), capture_output=True, timeout=10
+            )
             if result.returncode == 0:
                 return json.loads(result.stdout)
             else:
-                return {"error": f"Command failed: {result.stderr}"}
+                return {"error": f"Command failed: {result.stderr.decode('utf-8', errors='replace')}"}
         except subprocess.TimeoutExpired:
             return {"error": "Command timed out"}
         except json.JSONDecodeError as e: